@@ -0,0 +1,87 @@
+"""
+Нагрузочный прогон пула соединений против локального Postgres с разными размерами пула.
+
+Каждый из --concurrency клиентов выполняет запросы подряд: берёт соединение,
+держит его --hold-ms миллисекунд (pg_sleep, имитация работы запроса) и
+возвращает. Для каждого размера пула печатаются пропускная способность,
+ожидание выдачи соединения, длительность запросов, тайм-ауты и наибольшее насыщение.
+
+Подключение берётся из тех же настроек (.env), что и у приложения; max_overflow
+и pool_timeout — из настроек пула.
+
+Запуск из корня проекта: python -m benchmarks.db_pool_load_test --sizes 2 5 10 20
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from configs.settings import get_settings
+from modules.db_metrics.main import InstrumentedAsyncPool, db_metrics, instrument_queries
+
+settings = get_settings()
+DATABASE_URL = f"postgresql+asyncpg://{settings.db_user}:{settings.db_password}@{settings.db_host}/{settings.db_name}"
+
+
+async def client(engine, requests: int, hold: float) -> int:
+    timeouts = 0
+    for _ in range(requests):
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT pg_sleep(:hold)"), {"hold": hold})
+        except exc.TimeoutError:
+            timeouts += 1
+    return timeouts
+
+
+async def run(pool_size: int, args) -> dict:
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={"statement_cache_size": settings.db_statement_cache_size},
+    )
+    instrument_queries(engine.sync_engine)
+    try:
+        # Прогрев: соединения открываются до замера
+        await asyncio.gather(*(client(engine, 1, 0) for _ in range(pool_size)))
+        db_metrics.reset()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(engine, args.requests, args.hold_ms / 1000) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stats = db_metrics.stats()
+    finally:
+        await engine.dispose()
+    return {"elapsed": elapsed, **stats}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="запросов на одного клиента")
+    parser.add_argument("--hold-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    total = args.concurrency * args.requests
+    print(f"клиентов: {args.concurrency}, запросов: {total}, удержание: {args.hold_ms} мс, "
+          f"max_overflow: {settings.db_max_overflow}")
+    print(f"{'пул':>4} {'зап/с':>8} {'ожид. p50':>10} {'ожид. p95':>10} {'ожид. max':>10} "
+          f"{'запрос p95':>11} {'тайм-ауты':>10} {'насыщение':>10}")
+    for size in args.sizes:
+        result = await run(size, args)
+        wait = result["checkout_wait"]
+        print(f"{size:>4} {total / result['elapsed']:>8.0f} {wait['p50_seconds'] * 1000:>8.1f}мс "
+              f"{wait['p95_seconds'] * 1000:>8.1f}мс {wait['max_seconds'] * 1000:>8.1f}мс "
+              f"{result['queries']['p95_seconds'] * 1000:>9.1f}мс {result['timeouts']:>10} "
+              f"{result['max_saturation']:>10.2f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
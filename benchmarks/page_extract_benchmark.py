@@ -0,0 +1,119 @@
+"""
+Последовательное и параллельное извлечение текста страниц PDF.
+
+Книга генерируется: страницы по ~2.5 КБ текста, как в типичном учебнике. Замеряются
+разбор PDF (его повторяет каждый кусок параллельной волны), извлечение одной страницы,
+запуск пула процессов и сами сценарии: поиск введения со страницы 2 и полный просмотр
+списков разной длины. Параллельный выигрыш ограничен числом ядер (os.cpu_count()).
+
+Запуск из корня проекта: python -m benchmarks.page_extract_benchmark --workers 2 4 --chunk-size 32
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from configs.settings import get_settings
+from modules.book_upload.main import open_pdf
+from modules.get_book_intro.page_extract import _get_pool, iter_page_texts
+
+settings = get_settings()
+
+LINE = "The quick brown fox jumps over the lazy dog while the intro page keeps going on"
+LINES_PER_PAGE = 32
+
+
+def make_book(pages: int, intro_page: int) -> str:
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for number in range(pages):
+        page = PageObject.create_blank_page(None, 595, 842)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        first = "Vvedenie" if number == intro_page else f"Page {number}"
+        lines = [first] + [LINE] * LINES_PER_PAGE
+        stream = DecodedStreamObject()
+        stream.set_data(("BT /F1 9 Tf 12 TL 40 800 Td "
+                         + " ".join(f"({line}) Tj T*" for line in lines) + " ET").encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        writer.add_page(page)
+    file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    with file:
+        writer.write(file)
+    return file.name
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def find_intro(path: str, page_numbers: list[int], workers: int, chunk_size: int) -> int:
+    with open_pdf(path) as pdf:
+        for page_num, text in iter_page_texts(pdf, path, page_numbers, workers, chunk_size, min_pages=0):
+            if "Vvedenie" in text:
+                return page_num
+    return -1
+
+
+def read_all(path: str, page_numbers: list[int], workers: int, chunk_size: int) -> int:
+    with open_pdf(path) as pdf:
+        texts = iter_page_texts(pdf, path, page_numbers, workers, chunk_size, min_pages=0)
+        return sum(len(text) for _, text in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--pages", type=int, nargs="+", default=[30, 100, 300])
+    parser.add_argument("--chunk-size", type=int, default=settings.pdf_extract_chunk_size)
+    args = parser.parse_args()
+    chunk = args.chunk_size
+
+    path = make_book(max(args.pages), intro_page=2)
+    try:
+        def parse():
+            with open_pdf(path) as pdf:
+                return len(pdf.pages)
+
+        with open_pdf(path) as pdf:
+            page_time = best_of(lambda: pdf.pages[5].extract_text(), 10)
+        print(f"ядер: {os.cpu_count()}; разбор PDF на {max(args.pages)} страниц: {best_of(parse) * 1000:.1f} мс, "
+              f"извлечение страницы: {page_time * 1000:.2f} мс")
+        for workers in args.workers:
+            started = time.perf_counter()
+            _get_pool(workers).submit(int).result()
+            print(f"запуск пула на {workers} процесса: {(time.perf_counter() - started) * 1000:.0f} мс")
+
+        scan = list(range(20)) + list(range(max(args.pages) - 10, max(args.pages)))
+        print(f"поиск введения на странице 2 среди {len(scan)} страниц (куски по {chunk}):")
+        print(f"  последовательно: {best_of(lambda: find_intro(path, scan, 1, chunk)) * 1000:8.1f} мс")
+        for workers in args.workers:
+            _get_pool(workers)
+            print(f"  {workers} процесса:      {best_of(lambda: find_intro(path, scan, workers, chunk)) * 1000:8.1f} мс")
+
+        for pages in args.pages:
+            numbers = list(range(pages))
+            print(f"все {pages} страниц (куски по {chunk}):")
+            print(f"  последовательно: {best_of(lambda: read_all(path, numbers, 1, chunk)) * 1000:8.1f} мс")
+            for workers in args.workers:
+                _get_pool(workers)
+                print(f"  {workers} процесса:      {best_of(lambda: read_all(path, numbers, workers, chunk)) * 1000:8.1f} мс")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
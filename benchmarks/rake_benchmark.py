@@ -0,0 +1,61 @@
+"""
+Сравнение прежнего выделения фраз RAKE (одно регулярное выражение из всех стоп-слов)
+с проходом по токенам и поиском в множестве стоп-слов.
+
+Проверяет, что кандидаты совпадают, и показывает время на символ для текстов
+разной длины: у нового варианта оно не растёт с длиной текста.
+
+Запуск из корня проекта: python -m benchmarks.rake_benchmark
+"""
+import re
+import time
+
+from modules.stopwords.main import stopword_registry
+from modules.tags_extract.text_rank_3 import Rake, preprocess_text, split_phrases
+
+SAMPLE = """Раздел «Арифметические основы ЭВМ» дисциплины «Дискретная математика» является одним из первых специальных курсов, которые формируют у студентов понимание основополагающих вопросов организации ЭВМ, принципы построения отдельных устройств ЭВМ, их взаимосвязь. Он должен сформировать начальные знания для лучшего понимания последующих спецдисциплин. Основная цель настоящего учебного пособия – помочь студенту, приступившему к изучению арифметики ЭВМ, приобрести теоретические знания и практические навыки представления чисел и выполнения основных арифметических операций. Рассматриваемый в пособии теоретический материал сопровождается большим количеством примеров, что делает более понятным излагаемый материал и упрощает выполнение домашних заданий. """
+
+
+def legacy_phrases(text: str, stop_words) -> list[str]:
+    """
+    Прежние build_stop_word_regex и generate_candidate_keywords, только для сравнения.
+    """
+    pattern = re.compile('|'.join(r'\b' + re.escape(word) + r'(?![\w-])' for word in stop_words), re.IGNORECASE)
+    phrases = []
+    for phrase in re.sub(pattern, '|', text.strip()).split("|"):
+        phrase = phrase.strip().lower()
+        if phrase != "":
+            phrases.append(phrase)
+    return phrases
+
+
+def measure(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    stop_words = stopword_registry.get("tags")
+    # Сортировка фиксирует порядок альтернатив прежнего регулярного выражения
+    ordered = sorted(stop_words)
+    text = preprocess_text(SAMPLE)
+    assert legacy_phrases(text, ordered) == [' '.join(p) for p in split_phrases(text.split(), stop_words)]
+    print("кандидаты совпадают с прежней реализацией")
+
+    rake = Rake()
+    print(f"{'символов':>10} {'regex, мс':>10} {'токены, мс':>11} {'run, мс':>9} {'run, нс/символ':>15}")
+    for factor in (10, 20, 40, 80, 160, 320):
+        text = preprocess_text(SAMPLE * factor)
+        legacy = measure(lambda: legacy_phrases(text, ordered))
+        tokens = measure(lambda: split_phrases(text.split(), stop_words))
+        full = measure(lambda: rake.run(SAMPLE * factor))
+        print(f"{len(text):>10} {legacy * 1000:>10.2f} {tokens * 1000:>11.2f} {full * 1000:>9.2f} "
+              f"{full / len(text) * 1e9:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Сравнение поштучного расчёта весов рекомендаций с векторизованным ядром NumPy
+на 100 000 кандидатов.
+
+Проверяет, что лучшие книги и их веса совпадают с прежним циклом.
+
+Запуск из корня проекта: python -m benchmarks.recommendation_scoring_benchmark
+"""
+import datetime
+import math
+import random
+import time
+from math import exp, pi, sin
+
+from modules.recommendation_scoring.main import build_columns, score_candidates, top_k_indices
+from services.RecommendationService import RecommendationService
+
+CANDIDATES = 100_000
+TOP_N = 5
+VOCABULARY = [f"тег{i}" for i in range(2000)]
+
+
+def legacy_scores(rows, current_tags, global_avg_rating, k, max_popularity, now):
+    """
+    Прежний цикл из RecommendationService.get_recommendations, только для сравнения.
+    """
+    s = RecommendationService
+    recommendations = []
+    for i, (rating_count, average_rating, book_time, tags) in enumerate(rows):
+        tag_weight = 0
+        max_possible_tag_weight = len(current_tags) * sin(pi / 2)
+        for tag in set(current_tags).intersection(set(tags)):
+            if tag in current_tags:
+                index = current_tags.index(tag)
+                tag_weight += sin((pi / 2) * (len(current_tags) - index) / len(current_tags))
+        normalized_tag_weight = (tag_weight / max_possible_tag_weight) * 5
+        normalized_popularity_weight = (rating_count / max_popularity) * 5 if max_popularity > 0 else 0
+        weighted_rating = (rating_count / (rating_count + k) * average_rating) + (
+            k / (rating_count + k) * global_avg_rating
+        )
+        delta_days = (now - book_time).days
+        normalized_time_weight = exp(-s.TIME_DECAY_ALPHA * delta_days) * 5
+        final_weight = (
+            normalized_tag_weight * s.TAG_WEIGHT_COEFFICIENT +
+            normalized_popularity_weight * s.POPULARITY_COEFFICIENT +
+            weighted_rating * s.RATING_COEFFICIENT +
+            normalized_time_weight * s.TIME_WEIGHT_COEFFICIENT
+        )
+        recommendations.append((i, final_weight))
+    recommendations.sort(key=lambda x: x[1], reverse=True)
+    return recommendations[:TOP_N]
+
+
+def make_rows(rng: random.Random, now: datetime.datetime):
+    rows = []
+    for _ in range(CANDIDATES):
+        rating_count = rng.choice([0, 0, 1, 2, 3, 5, 8, 13, 40, 120])
+        average_rating = round(rng.uniform(1, 5), 2) if rating_count else 0.0
+        book_time = now - datetime.timedelta(days=rng.randint(0, 1500), seconds=rng.randint(0, 86399))
+        rows.append((rating_count, average_rating, book_time, rng.sample(VOCABULARY, 10)))
+    return rows
+
+
+def main():
+    rng = random.Random(18)
+    now = datetime.datetime.utcnow()
+    rows = make_rows(rng, now)
+    current_tags = rng.sample(VOCABULARY, 10)
+    max_popularity = max(row[0] for row in rows)
+    k = max_popularity / 10
+    global_avg_rating = 3.7
+
+    started = time.perf_counter()
+    expected = legacy_scores(rows, current_tags, global_avg_rating, k, max_popularity, now)
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = build_columns(rows, current_tags, now)
+    snapshot_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = score_candidates(
+        columns, len(current_tags), global_avg_rating, k, max_popularity,
+        RecommendationService.TAG_WEIGHT_COEFFICIENT, RecommendationService.POPULARITY_COEFFICIENT,
+        RecommendationService.RATING_COEFFICIENT, RecommendationService.TIME_WEIGHT_COEFFICIENT,
+        RecommendationService.TIME_DECAY_ALPHA,
+    )
+    top = top_k_indices(scores, TOP_N)
+    kernel_time = time.perf_counter() - started
+
+    assert [i for i, _ in expected] == top.tolist(), (expected, top)
+    assert all(math.isclose(w, scores[i], rel_tol=1e-12) for i, w in expected)
+    print(f"кандидатов: {CANDIDATES}, лучшие {TOP_N} совпадают с прежним циклом")
+    print(f"прежний цикл:          {legacy_time * 1000:8.1f} мс")
+    print(f"снимок колонок:        {snapshot_time * 1000:8.1f} мс")
+    print(f"ядро NumPy + top-k:    {kernel_time * 1000:8.1f} мс")
+
+
+if __name__ == '__main__':
+    main()
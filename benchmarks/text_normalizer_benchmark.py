@@ -0,0 +1,89 @@
+"""
+Замер скорости общего нормализатора текста в сравнении с прежними цепочками re.sub.
+
+Побайтовое совпадение результатов проверяет tests/test_text_normalizer.py.
+
+Запуск из корня проекта: python -m benchmarks.text_normalizer_benchmark
+"""
+import re
+import time
+
+from modules.text_normalizer.main import (
+    keywords_normalizer, letters_normalizer, rake_normalizer, yake_normalizer,
+)
+
+SAMPLE = """3  ВВЕДЕНИЕ  \n \nДанное  учебное пособие предназначено  для иностранных студентов  \nподготовительного отделения и первого курса бакалавриата  всех \nнаправлений  подготовки.  \nПособие  состоит  из пяти  уроков,  каждый  из которых  определяет  \nведущая  разговорная  тема.  В конце  пособия  находятся  Приложение , в \nкоторое  входят  ответы к  заданиям,  и Фразеологический  словарь . \nХарактер  включенного  в пособие  материала  определяется  теми  \nтрудностями,  которые  имеются  у иностранцев,  изучающих  русский  язык.  \nКаждый  урок  на основе  заданий  «Давайте  поговорим»,  «Кинозал»,  \n«Повторите  грамматический материал», «Проверьте свое понимание  \nтекста»  решает определенные речевые  задачи, способствует развитию у  \nучащихся  умения  строить  как монологичес кие, так и диалогические  \nвысказывания.  \nБо́льшую  часть  заданий  можно  выполнять  устно.  \nВ пособии  используются  отрывки  из художественных  произведений,  \nа также материалы  из газет  и журналов.
+Прежде чем решать задачу – прочитай условие.  \nЖак Адамар  \nПРЕДИСЛОВИЕ  \nРаздел «Арифметические основы ЭВМ» дисциплины «Дискретная м а-\nтематика» явля ется одним из первых специальных курсов, которые форм и-\nруют у студентов понимание  основополагающих вопросов организации \nЭВМ, принципы построения отдельных устройств ЭВМ, их взаимосвязь. Он \nдолжен сформировать начальные знания для лучшего понимания последу ю-\nщих спецдисциплин.  \nОсновная цель настоящего учебного пособия – помочь студенту, п ри-\nступившему к изучению арифметики ЭВМ, приобрести теоретические знания \nи практические навыки представления чисел и выполнения основных ари ф-\nметических операций.  \nВ Приложени ях приводятся варианты домашних заданий, а в 1990-2000 гг. вышло количе ство книг..."""
+
+
+def legacy_keywords(text: str) -> str:
+    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+)\s?-\n([а-яё]+)", r"\1\2", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s?([а-яё]+[аеёиоуыэюя])\s?-\s?([бвгджзйклмнпрстфхцчшщ][а-яё]+)\s?", r" \1\2 ", text,
+                  flags=re.IGNORECASE)
+    text = re.sub(r"\s([а-яё]{2}) ([а-яё])-\s([а-яё]+) ([аеёиоуыэюя]{2})\s", r" \1\2\3\4 ", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ые ", r"\1ые ", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ая ", r"\1ая ", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ях ", r"\1ях ", text, flags=re.IGNORECASE)
+    text = re.sub(r" ([мргнтчфждлхз]) ([а-яё]+)", r"\1\2 ", text, flags=re.IGNORECASE)
+    text = re.sub(r" п ри-", r"при", text, flags=re.IGNORECASE)
+    text = re.sub("\n|«|»|–|…|\\d{1}|гг\\.", '', text)
+    text = re.sub("предисловие", '', text, flags=re.IGNORECASE)
+    text = re.sub("количе ство", 'количество', text, flags=re.IGNORECASE)
+    text = re.sub(" {2,}|\\.{2,}", ' ', text)
+    return text.strip()
+
+
+def legacy_yake(text: str) -> str:
+    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub("\n|«|»|–|…|\\d|гг\\.", '', text)
+    text = re.sub("предисловие", '', text, flags=re.IGNORECASE)
+    text = re.sub(" {2,}", ' ', text)
+    return text.strip()
+
+
+def legacy_letters(text: str) -> str:
+    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    return re.sub("[^а-яА-ЯЁёa-zA-Z]", " ", text)
+
+
+def legacy_rake(text: str) -> str:
+    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
+    text = re.sub("[^а-яА-ЯЁёa-zA-Z]", " ", text)
+    return re.sub(" {2,}", " ", text)
+
+
+PAIRS = [
+    ("keywords", legacy_keywords, keywords_normalizer),
+    ("yake", legacy_yake, yake_normalizer),
+    ("letters", legacy_letters, letters_normalizer),
+    ("rake", legacy_rake, rake_normalizer),
+]
+
+
+def measure(func, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    text = SAMPLE * 200
+    pages = [text[i:i + 3000] for i in range(0, len(text), 3000)]
+    print(f"текст: {len(text)} символов, {len(pages)} страниц")
+    for name, legacy, normalizer in PAIRS:
+        # Прежние цепочки перекомпилируют шаблоны, когда кэш re переполнен; сбрасываем его для честного замера
+        before = measure(lambda t: (re.purge(), legacy(t)), text, 5)
+        after = measure(normalizer.normalize, text, 5)
+        streamed = measure(lambda t: ''.join(normalizer.stream(pages)), text, 5)
+        print(f"{name:>9}: re.sub {before * 1000:8.2f} мс, normalize {after * 1000:8.2f} мс, "
+              f"stream {streamed * 1000:8.2f} мс")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Сравнение прежнего построения графа TextRank (вложенные циклы по словарю
+и окнам) с разреженным TextRankEngine.
+
+Запуск из корня проекта: python -m benchmarks.text_rank_benchmark
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from modules.tags_extract.text_rank_engine import TextRankEngine
+
+MAX_ITERATIONS = 50
+d = 0.85
+threshold = 0.0001
+
+
+def legacy_rank(processed_text: list[str]) -> dict[str, float]:
+    """
+    Прежняя реализация из text_rank.get_keywords, оставлена только для сравнения.
+    """
+    vocab = list(set(processed_text))
+    vocab_len = len(vocab)
+    weighted_edge = np.zeros((vocab_len, vocab_len), dtype=np.float32)
+    score = np.zeros((vocab_len), dtype=np.float32)
+    window_size = 3
+    covered_coocurrences = []
+    for i in range(0, vocab_len):
+        score[i] = 1
+        for j in range(0, vocab_len):
+            if j == i:
+                weighted_edge[i][j] = 0
+            else:
+                for ww_start in range(0, len(processed_text) - window_size + 1):
+                    ww_end = ww_start + window_size
+                    ww_slice = processed_text[ww_start:ww_end]
+                    if ww_slice and (vocab[i] in ww_slice and vocab[j] in ww_slice):
+                        index_of_i = ww_start + ww_slice.index(vocab[i])
+                        index_of_j = ww_start + ww_slice.index(vocab[j])
+                        if [index_of_i, index_of_j] not in covered_coocurrences:
+                            weighted_edge[i][j] += 1 / math.fabs(index_of_i - index_of_j)
+                            covered_coocurrences.append([index_of_i, index_of_j])
+
+    inout = np.zeros(vocab_len, dtype=np.float32)
+    for i in range(0, vocab_len):
+        for j in range(0, vocab_len):
+            inout[i] += weighted_edge[i][j]
+    for _ in range(0, MAX_ITERATIONS):
+        prev_score = np.copy(score)
+        for i in range(0, vocab_len):
+            summation = 0
+            for j in range(0, vocab_len):
+                if weighted_edge[i][j] != 0:
+                    summation += (weighted_edge[i][j] / inout[j]) * score[j]
+            score[i] = (1 - d) + d * (summation)
+        if np.sum(np.fabs(prev_score - score)) <= threshold:
+            break
+    return dict(zip(vocab, score.tolist()))
+
+
+def make_tokens(count: int, vocab_size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    # Распределение Ципфа похоже на частоты слов в реальном тексте
+    weights = [1 / rank for rank in range(1, vocab_size + 1)]
+    return rng.choices([f"слово{i}" for i in range(vocab_size)], weights=weights, k=count)
+
+
+def top_words(scores: dict[str, float], k: int = 10) -> list[str]:
+    return [w for w, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]]
+
+
+def main():
+    engine = TextRankEngine(window_size=3, damping=d, max_iterations=MAX_ITERATIONS, threshold=threshold)
+    print(f"{'tokens':>8} {'vocab':>6} {'legacy, s':>10} {'sparse, s':>10} {'top-10 overlap':>15}")
+    for count, vocab_size in [(200, 80), (400, 150), (800, 250)]:
+        tokens = make_tokens(count, vocab_size)
+
+        started = time.perf_counter()
+        legacy = legacy_rank(tokens)
+        legacy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sparse_scores = engine.rank(tokens)
+        sparse_time = time.perf_counter() - started
+
+        overlap = len(set(top_words(legacy)) & set(top_words(sparse_scores)))
+        print(f"{count:>8} {len(set(tokens)):>6} {legacy_time:>10.3f} {sparse_time:>10.4f} {overlap:>12}/10")
+
+    for count in [10_000, 100_000, 1_000_000]:
+        tokens = make_tokens(count, count // 10)
+        started = time.perf_counter()
+        engine.rank(tokens)
+        print(f"sparse only: {count} tokens in {time.perf_counter() - started:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
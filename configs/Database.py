@@ -4,21 +4,36 @@ from typing import AsyncGenerator
 from fastapi import Depends
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase, SQLAlchemyBaseUserTableUUID
 from sqlalchemy import (
-    String, Column, Text, ForeignKey, DateTime, ARRAY, Float, Integer, Boolean
+    String, Column, Text, ForeignKey, DateTime, ARRAY, Float, Integer, Boolean, UniqueConstraint, Index
 )
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import (
     sessionmaker, declarative_base, relationship, mapped_column, Mapped
 )
 
 from configs.settings import get_settings
+from modules.db_metrics.main import InstrumentedAsyncPool, instrument_queries
 
 # Настройки подключения
 settings = get_settings()
 DATABASE_URL = f"postgresql+asyncpg://{settings.db_user}:{settings.db_password}@{settings.db_host}/{settings.db_name}"
 
 # Инициализация движка и сессии
-engine = create_async_engine(DATABASE_URL, echo=False)
+# Кэш подготовленных выражений ведут и asyncpg, и адаптер SQLAlchemy; 0 отключает оба (нужно за pgbouncer)
+engine = create_async_engine(
+    f"{DATABASE_URL}?prepared_statement_cache_size={settings.db_statement_cache_size}",
+    echo=False,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args={"statement_cache_size": settings.db_statement_cache_size},
+)
+instrument_queries(engine.sync_engine)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 EntityMeta = declarative_base()
@@ -63,10 +78,11 @@ class Book(EntityMeta):
     __tablename__ = 'books'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
-    section_id: Mapped[int] = mapped_column(ForeignKey("sections.id"))
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
+    section_id: Mapped[int] = mapped_column(ForeignKey("sections.id"), index=True)
     bookTitle: Mapped[str] = mapped_column(String, nullable=False)
-    tags = Column(ARRAY(String))
+    # Тип postgresql.ARRAY даёт оператор пересечения overlap (&&)
+    tags = Column(postgresql.ARRAY(String))
     time: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
     is_public: Mapped[bool] = mapped_column(default=False)
 
@@ -75,6 +91,51 @@ class Book(EntityMeta):
     bibliographic_reference = relationship("BibliographicReference", back_populates="book", uselist=False)
     publication_request = relationship("PublicationRequest", back_populates="book", uselist=False)
 
+    # GIN-индекс для поиска книг с общими тегами (оператор &&)
+    __table_args__ = (
+        Index("ix_books_tags_gin", "tags", postgresql_using="gin"),
+    )
+
+
+class AnalysisJob(EntityMeta):
+    __tablename__ = 'analysis_jobs'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
+    section_id: Mapped[int] = mapped_column(ForeignKey("sections.id"))
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=True)
+    bookTitle: Mapped[str] = mapped_column(String, nullable=False)
+    file_path: Mapped[str] = mapped_column(String, nullable=False)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    priority: Mapped[int] = mapped_column(Integer, default=1)
+    status: Mapped[str] = mapped_column(String, default='queued')
+    stage: Mapped[str] = mapped_column(String, nullable=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
+    started_at: Mapped[datetime.datetime] = mapped_column(nullable=True)
+    heartbeat_at: Mapped[datetime.datetime] = mapped_column(nullable=True)
+    finished_at: Mapped[datetime.datetime] = mapped_column(nullable=True)
+
+    book = relationship("Book")
+
+
+class AnalysisCache(EntityMeta):
+    __tablename__ = 'analysis_cache'
+    __table_args__ = (
+        UniqueConstraint("content_sha256", "analyzer_version", "stopwords_version", name="uq_analysis_cache_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    analyzer_version: Mapped[str] = mapped_column(String, nullable=False)
+    stopwords_version: Mapped[str] = mapped_column(String, nullable=False)
+    tags = Column(ARRAY(String))
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
+
 
 class BibliographicReference(EntityMeta):
     __tablename__ = 'bibliographic_references'
@@ -90,6 +151,13 @@ class BibliographicReference(EntityMeta):
     pages: Mapped[int] = mapped_column(Integer, nullable=False)
     average_rating: Mapped[float] = mapped_column(Float, default=0.0)
     rating_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Сумма оценок: средний рейтинг пересчитывается без агрегации по отзывам
+    rating_sum: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+    # Время последнего изменения справки, в том числе её рейтинга; для выгрузки изменений
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow,
+        server_default=text("(now() at time zone 'utc')"),
+    )
     book = relationship("Book", back_populates="bibliographic_reference")
     feedbacks = relationship("BookFeedback", back_populates="bibliographic_reference")
 
@@ -98,8 +166,8 @@ class BookFeedback(EntityMeta):
     __tablename__ = 'book_feedback'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    bibliographic_reference_id: Mapped[int] = mapped_column(ForeignKey("bibliographic_references.id"))
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
+    bibliographic_reference_id: Mapped[int] = mapped_column(ForeignKey("bibliographic_references.id"), index=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
     rating: Mapped[float] = mapped_column(Float, nullable=False)
     comment: Mapped[str] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
@@ -108,6 +176,19 @@ class BookFeedback(EntityMeta):
     user = relationship("User", back_populates="feedbacks")
 
 
+class RatingStats(EntityMeta):
+    """
+    Глобальные счётчики оценок, разбитые на строки по id справки (см. RATING_STATS_SHARDS);
+    итог — сумма по всем строкам.
+    """
+    __tablename__ = 'rating_stats'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    rating_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    rating_count: Mapped[int] = mapped_column(Integer, default=0)
+    max_reference_rating_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class Report(EntityMeta):
     __tablename__ = 'reports'
 
@@ -149,11 +230,6 @@ class ModeratorSection(EntityMeta):
 
 # === ХЕЛПЕРЫ ===
 
-async def create_db_and_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(EntityMeta.metadata.create_all)
-
-
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
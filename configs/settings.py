@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Optional
 
 from dotenv import find_dotenv
 from pydantic_settings import BaseSettings
@@ -11,6 +12,84 @@ class Settings(BaseSettings):
     db_user: str
     secret: str
 
+    # Пул соединений с БД на один процесс uvicorn; кэш подготовленных выражений asyncpg
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    # Пул процессов mystem
+    mystem_pool_size: int = 2
+    mystem_pool_max_waiting: int = 32
+    mystem_pool_acquire_timeout: float = 30.0
+    mystem_pool_health_interval: float = 30.0
+
+    # Пул процессов для CPU-ёмкого анализа
+    analysis_workers: int = 2
+    analysis_job_timeout: float = 300.0
+    analysis_poll_interval: float = 1.0
+
+    # Загрузка файлов
+    upload_dir: str = "uploads"
+    max_upload_bytes: int = 256 * 1024 * 1024
+    upload_chunk_size: int = 1024 * 1024
+
+    # Поиск введения: сколько страниц с начала и с конца книги просматривать
+    intro_scan_head_pages: int = 20
+    intro_scan_tail_pages: int = 10
+
+    # Параллельное извлечение текста страниц при поиске введения; 1 — последовательно.
+    # Каждый кусок заново разбирает PDF, поэтому куски крупные, а параллельно извлекаются
+    # только списки не короче pdf_extract_parallel_min_pages страниц (см. page_extract_benchmark)
+    pdf_extract_workers: int = 1
+    pdf_extract_chunk_size: int = 32
+    pdf_extract_parallel_min_pages: int = 200
+
+    # Как часто проверять файлы стоп-слов на изменения, секунды
+    stopwords_reload_interval: float = 5.0
+
+    # Кэш результатов анализа по хэшу содержимого
+    analysis_cache_lru_size: int = 1024
+
+    # Кэш морфологических разборов; файл словоформ для прогрева необязателен
+    morph_cache_size: int = 100_000
+    morph_cache_warm_start: Optional[str] = None
+
+    # spaCy: размер пачки предложений, число процессов nlp.pipe и отключённые компоненты
+    spacy_batch_size: int = 64
+    spacy_n_process: int = 1
+    spacy_disabled_components: list[str] = ["lemmatizer"]
+
+    # Очередь фоновых задач анализа
+    analysis_job_workers: int = 2
+    analysis_job_max_per_user: int = 2
+    analysis_job_max_attempts: int = 3
+    analysis_job_poll_interval: float = 5.0
+    analysis_job_stale_after: float = 600.0
+    analysis_job_heartbeat_interval: float = 60.0
+
+    # Пакетное тегирование: параллелизм, размер пачки вставки, число файлов в одном запросе
+    # и каталог для импорта с сервера
+    batch_analysis_concurrency: int = 2
+    batch_max_files: int = 20
+    batch_insert_size: int = 50
+    batch_flush_interval: float = 2.0
+    batch_import_root: Optional[str] = None
+
+    # Кэш рекомендаций: число книг, время жизни записи в секундах и необязательный общий Redis
+    recommendation_cache_size: int = 1024
+    recommendation_cache_ttl: float = 300.0
+    recommendation_cache_redis_url: Optional[str] = None
+
+    # Постраничная выдача списков: размер страницы по умолчанию и наибольший допустимый
+    page_size_default: int = 50
+    page_size_max: int = 500
+
+    # Выгрузка каталога: сколько строк читать с серверного курсора за раз
+    catalog_export_batch_size: int = 500
+
     class Config:
         env_file = find_dotenv(".env")
 
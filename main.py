@@ -1,15 +1,23 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
 
-from configs.Database import create_db_and_tables
+from configs.settings import get_settings
+from migrations.main import migrate
+from modules.analysis_executor.main import analysis_executor
+from modules.mystem_pool.main import mystem_pool
+from modules.pagination.main import NEXT_CURSOR_HEADER
 from routers.FeedbackRouter import FeedbackRouter
 from routers.RequestsRouter import RequestsRouter
 from routers.SectionRouter import SectionRouter
 from routers.UserRouter import UserRouter
 from routers.DocumentRouter import DocumentRouter
 from routers.BibliographicReferenceRouter import BibliographicRouter
+from routers.MetricsRouter import MetricsRouter
+from services.AnalysisJobService import analysis_job_dispatcher
 app = FastAPI()
+settings = get_settings()
 
 origins = [
     "http://localhost",
@@ -23,17 +31,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+# Запас на границы и заголовки частей multipart поверх размера самого файла
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Пределы Content-Length для маршрутов загрузки; пакет ограничен суммарным размером своих файлов
+UPLOAD_LIMITS = {
+    "/v1/analyze/": settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+    "/v1/analyze/mystem": settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+    "/v1/analyze/jobs": settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+    "/v1/analyze/batch": (settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES) * settings.batch_max_files,
+}
+
+
+@app.middleware("http")
+async def reject_large_uploads(request: Request, call_next):
+    """
+    Отклоняет слишком большие загрузки по Content-Length до разбора тела запроса.
+    Предел задаётся для каждого маршрута загрузки отдельно, остальные запросы не проверяются.
+    """
+    limit = UPLOAD_LIMITS.get(request.url.path) if request.method == "POST" else None
+    content_length = request.headers.get("content-length")
+    if limit and content_length and content_length.isdigit() and int(content_length) > limit:
+        return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+    return await call_next(request)
+
+
 app.include_router(UserRouter)
 app.include_router(RequestsRouter)
 app.include_router(FeedbackRouter)
 app.include_router(BibliographicRouter)
 app.include_router(DocumentRouter)
 app.include_router(SectionRouter)
+app.include_router(MetricsRouter)
 @app.on_event("startup")
 async def on_startup():
-    await create_db_and_tables()
+    await migrate()
+    await mystem_pool.start()
+    analysis_executor.start()
+    analysis_job_dispatcher.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await analysis_job_dispatcher.close()
+    await mystem_pool.close()
+    analysis_executor.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+Версионные миграции схемы БД.
+
+Применённые версии записываются в таблицу schema_migrations. Все недостающие
+версии применяются в одной транзакции под advisory-блокировкой, поэтому
+несколько одновременно стартующих воркеров uvicorn не выполняют их дважды.
+
+Запуск вручную из корня проекта: python -m migrations.main
+"""
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from configs.Database import engine
+from migrations.versions import MIGRATIONS, Migration
+
+# Ключ advisory-блокировки, сериализующей применение миграций
+MIGRATION_LOCK_KEY = 7310252
+
+
+async def migrate(target: AsyncEngine = engine) -> list[Migration]:
+    """
+    Применяет недостающие миграции по возрастанию версии и возвращает применённые.
+    """
+    applied = []
+    async with target.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version integer PRIMARY KEY, "
+            "description text NOT NULL, "
+            "applied_at timestamp without time zone NOT NULL DEFAULT (now() at time zone 'utc'))"
+        ))
+        result = await conn.execute(text("SELECT version FROM schema_migrations"))
+        done = set(result.scalars())
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            if migration.version in done:
+                continue
+            for step in migration.steps:
+                if isinstance(step, str):
+                    await conn.execute(text(step))
+                else:
+                    await step(conn)
+            await conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": migration.version, "description": migration.description},
+            )
+            applied.append(migration)
+    return applied
+
+
+async def main():
+    applied = await migrate()
+    for migration in applied:
+        print(f"{migration.version}: {migration.description}")
+    if not applied:
+        print("Схема в актуальном состоянии")
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
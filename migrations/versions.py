@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Union
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+Step = Union[str, Callable[[AsyncConnection], Awaitable[None]]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Версия схемы: SQL-команды или функции, выполняемые по порядку в общей транзакции.
+    """
+    version: int
+    description: str
+    steps: tuple[Step, ...]
+
+
+# Схема, которую create_all создавал при старте до появления миграций; зафиксирована
+# явным DDL, чтобы v1 не менялась вместе с моделями. Колонки, таблицы и индексы
+# из версий 2 и 3 сюда не входят
+INITIAL_SCHEMA: tuple[str, ...] = (
+    "CREATE TABLE IF NOT EXISTS users ("
+    "id uuid PRIMARY KEY, "
+    "email varchar(320) NOT NULL, "
+    "hashed_password varchar(1024) NOT NULL, "
+    "is_active boolean NOT NULL, "
+    "is_superuser boolean NOT NULL, "
+    "is_verified boolean NOT NULL)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE TABLE IF NOT EXISTS sections ("
+    "id serial PRIMARY KEY, "
+    "name varchar NOT NULL UNIQUE, "
+    "description varchar)",
+    "CREATE TABLE IF NOT EXISTS analysis_cache ("
+    "id serial PRIMARY KEY, "
+    "content_sha256 varchar(64) NOT NULL, "
+    "analyzer_version varchar NOT NULL, "
+    "stopwords_version varchar NOT NULL, "
+    "tags varchar[], "
+    "created_at timestamp without time zone NOT NULL, "
+    "CONSTRAINT uq_analysis_cache_key UNIQUE (content_sha256, analyzer_version, stopwords_version))",
+    "CREATE TABLE IF NOT EXISTS books ("
+    "id serial PRIMARY KEY, "
+    "user_id uuid NOT NULL REFERENCES users (id), "
+    "section_id integer NOT NULL REFERENCES sections (id), "
+    "\"bookTitle\" varchar NOT NULL, "
+    "tags varchar[], "
+    "time timestamp without time zone NOT NULL, "
+    "is_public boolean NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS moderator_section ("
+    "user_id uuid NOT NULL REFERENCES users (id), "
+    "section_id integer NOT NULL REFERENCES sections (id), "
+    "PRIMARY KEY (user_id, section_id))",
+    "CREATE TABLE IF NOT EXISTS reports ("
+    "id serial PRIMARY KEY, "
+    "text text, "
+    "\"userId\" uuid NOT NULL REFERENCES users (id))",
+    "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+    "id serial PRIMARY KEY, "
+    "user_id uuid NOT NULL REFERENCES users (id), "
+    "section_id integer NOT NULL REFERENCES sections (id), "
+    "book_id integer REFERENCES books (id), "
+    "\"bookTitle\" varchar NOT NULL, "
+    "file_path varchar NOT NULL, "
+    "content_sha256 varchar(64) NOT NULL, "
+    "priority integer NOT NULL, "
+    "status varchar NOT NULL, "
+    "stage varchar, "
+    "progress double precision NOT NULL, "
+    "attempts integer NOT NULL, "
+    "error text, "
+    "created_at timestamp without time zone NOT NULL, "
+    "started_at timestamp without time zone, "
+    "heartbeat_at timestamp without time zone, "
+    "finished_at timestamp without time zone)",
+    "CREATE TABLE IF NOT EXISTS bibliographic_references ("
+    "id serial PRIMARY KEY, "
+    "book_id integer NOT NULL UNIQUE REFERENCES books (id), "
+    "title varchar NOT NULL, "
+    "author varchar NOT NULL, "
+    "publisher varchar NOT NULL, "
+    "isbn varchar NOT NULL, "
+    "year integer NOT NULL, "
+    "city varchar NOT NULL, "
+    "pages integer NOT NULL, "
+    "average_rating double precision NOT NULL, "
+    "rating_count integer NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS publication_requests ("
+    "id serial PRIMARY KEY, "
+    "book_id integer NOT NULL UNIQUE REFERENCES books (id), "
+    "user_id uuid NOT NULL REFERENCES users (id), "
+    "moderator_id uuid REFERENCES users (id), "
+    "status varchar NOT NULL, "
+    "moderator_comment text, "
+    "created_at timestamp without time zone NOT NULL, "
+    "reviewed_at timestamp without time zone)",
+    "CREATE TABLE IF NOT EXISTS book_feedback ("
+    "id serial PRIMARY KEY, "
+    "bibliographic_reference_id integer NOT NULL REFERENCES bibliographic_references (id), "
+    "user_id uuid NOT NULL REFERENCES users (id), "
+    "rating double precision NOT NULL, "
+    "comment varchar, "
+    "created_at timestamp without time zone NOT NULL)",
+)
+
+
+# Заполнение счётчиков по уже существующим отзывам. Написано SQL, а не через
+# RatingStatsRepository: миграция не должна меняться вместе с моделями. Итог по
+# каталогу пишется в строку id = 1, при чтении строки счётчиков суммируются
+BACKFILL_RATING_STATS: tuple[str, ...] = (
+    "UPDATE bibliographic_references SET "
+    "rating_sum = COALESCE((SELECT sum(f.rating) FROM book_feedback f "
+    "WHERE f.bibliographic_reference_id = bibliographic_references.id), 0), "
+    "rating_count = (SELECT count(*) FROM book_feedback f "
+    "WHERE f.bibliographic_reference_id = bibliographic_references.id), "
+    "average_rating = COALESCE((SELECT avg(f.rating) FROM book_feedback f "
+    "WHERE f.bibliographic_reference_id = bibliographic_references.id), 0)",
+    "INSERT INTO rating_stats (id, rating_sum, rating_count, max_reference_rating_count) "
+    "SELECT 1, COALESCE(sum(rating), 0), count(*), "
+    "(SELECT COALESCE(max(rating_count), 0) FROM bibliographic_references) "
+    "FROM book_feedback "
+    "ON CONFLICT (id) DO UPDATE SET "
+    "rating_sum = excluded.rating_sum, "
+    "rating_count = excluded.rating_count, "
+    "max_reference_rating_count = excluded.max_reference_rating_count",
+)
+
+
+# Новые версии добавляются только в конец; применённые не изменяются
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "Таблицы моделей", INITIAL_SCHEMA),
+    Migration(2, "Счётчики рейтинга и время изменения справок", (
+        "ALTER TABLE bibliographic_references "
+        "ADD COLUMN IF NOT EXISTS rating_sum double precision NOT NULL DEFAULT 0",
+        "ALTER TABLE bibliographic_references "
+        "ADD COLUMN IF NOT EXISTS updated_at timestamp without time zone NOT NULL "
+        "DEFAULT (now() at time zone 'utc')",
+        "CREATE TABLE IF NOT EXISTS rating_stats ("
+        "id integer PRIMARY KEY, "
+        "rating_sum double precision NOT NULL DEFAULT 0, "
+        "rating_count integer NOT NULL DEFAULT 0, "
+        "max_reference_rating_count integer NOT NULL DEFAULT 0)",
+        *BACKFILL_RATING_STATS,
+    )),
+    Migration(3, "Индексы внешних ключей и GIN-индекс тегов", (
+        "CREATE INDEX IF NOT EXISTS ix_books_user_id ON books (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_books_section_id ON books (section_id)",
+        "CREATE INDEX IF NOT EXISTS ix_book_feedback_bibliographic_reference_id "
+        "ON book_feedback (bibliographic_reference_id)",
+        "CREATE INDEX IF NOT EXISTS ix_book_feedback_user_id ON book_feedback (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_books_tags_gin ON books USING gin (tags)",
+    )),
+)
@@ -0,0 +1,193 @@
+import asyncio
+import importlib
+import itertools
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from starlette.requests import Request
+
+from configs.settings import get_settings
+
+
+class AnalysisTimeout(Exception):
+    """
+    Задача анализа не уложилась в отведённое время.
+    """
+
+
+class AnalysisCancelled(Exception):
+    """
+    Задача анализа отменена, потому что клиент отключился.
+    """
+
+
+# Состояние дочернего процесса: номер слота и общие с родителем массивы
+_slot: Optional[int] = None
+_job_ids = None
+_cancel_requests = None
+
+_CAN_INTERRUPT = hasattr(signal, "SIGALRM") and hasattr(signal, "SIGUSR1")
+
+# Источники статистики, живущей в дочерних процессах (например, кэш разборов pymorphy3)
+_stats_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register_worker_stats(name: str, source: Callable[[], dict]) -> None:
+    """
+    Регистрирует функцию статистики дочернего процесса; её результат
+    возвращается родителю вместе с результатом каждой задачи.
+    """
+    _stats_sources[name] = source
+
+
+def _init_worker(job_ids, cancel_requests, pids, counter, preload: tuple[str, ...]) -> None:
+    """
+    Инициализация дочернего процесса: занимает слот и один раз загружает модели.
+    """
+    global _slot, _job_ids, _cancel_requests
+    with counter.get_lock():
+        _slot = counter.value % len(job_ids)
+        counter.value += 1
+    _job_ids = job_ids
+    _cancel_requests = cancel_requests
+    pids[_slot] = os.getpid()
+    if _CAN_INTERRUPT:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.signal(signal.SIGUSR1, _on_cancel)
+    for module_name in preload:
+        importlib.import_module(module_name)
+
+
+def _on_timeout(signum, frame) -> None:
+    if _job_ids[_slot]:
+        raise AnalysisTimeout("Превышено время выполнения задачи анализа")
+
+
+def _on_cancel(signum, frame) -> None:
+    if _job_ids[_slot] and _cancel_requests[_slot] == _job_ids[_slot]:
+        raise AnalysisCancelled("Задача анализа отменена")
+
+
+def _run_job(job_id: int, timeout: float, func: Callable, args: tuple) -> tuple[int, Any, dict]:
+    """
+    Выполняет задачу в дочернем процессе с ограничением по времени.
+    Возвращает слот процесса, результат и статистику процесса после задачи.
+    """
+    _job_ids[_slot] = job_id
+    if _CAN_INTERRUPT:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = func(*args)
+        return _slot, result, {name: source() for name, source in _stats_sources.items()}
+    finally:
+        if _CAN_INTERRUPT:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        _job_ids[_slot] = 0
+
+
+class AnalysisExecutor:
+    """
+    Пул процессов для CPU-ёмкого анализа (PyPDF2, spaCy, pymorphy3, YAKE).
+
+    Каждый дочерний процесс один раз импортирует модули из preload, поэтому
+    модели загружаются при старте процесса, а не на каждую задачу.
+    Асинхронные обработчики ожидают результат через run(), не блокируя цикл событий.
+    """
+
+    def __init__(self, workers: int, job_timeout: float, poll_interval: float, preload: tuple[str, ...] = ()):
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self.preload = preload
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._job_ids = None
+        self._cancel_requests = None
+        self._pids = None
+        self._ids = itertools.count(1)
+        self._worker_stats: dict[int, dict] = {}
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._job_ids = context.Array("q", self.workers, lock=False)
+        self._cancel_requests = context.Array("q", self.workers, lock=False)
+        self._pids = context.Array("q", self.workers, lock=False)
+        counter = context.Value("i", 0)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._job_ids, self._cancel_requests, self._pids, counter, self.preload),
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._worker_stats.clear()
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None,
+                  request: Optional[Request] = None) -> Any:
+        """
+        Выполняет func(*args) в дочернем процессе и возвращает результат.
+
+        :param timeout: Ограничение времени задачи, по умолчанию job_timeout.
+        :param request: HTTP-запрос; при отключении клиента задача отменяется.
+        """
+        if self._pool is None:
+            self.start()
+        timeout = timeout or self.job_timeout
+        job_id = next(self._ids)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, _run_job, job_id, timeout, func, args)
+        # Запас на случай, если дочерний процесс не может прервать задачу сигналом
+        deadline = loop.time() + timeout + self.poll_interval
+
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=self.poll_interval)
+            if done:
+                slot, result, stats = future.result()
+                self._worker_stats[slot] = stats
+                return result
+            if request is not None and await request.is_disconnected():
+                self._cancel(job_id, future)
+                raise AnalysisCancelled("Клиент отключился, задача анализа отменена")
+            if loop.time() > deadline:
+                self._cancel(job_id, future)
+                raise AnalysisTimeout("Превышено время выполнения задачи анализа")
+
+    def worker_stats(self, name: str) -> list[dict]:
+        """
+        Статистика name по дочерним процессам на момент их последней завершённой задачи.
+        """
+        return [stats[name] for _, stats in sorted(self._worker_stats.items()) if name in stats]
+
+    def _cancel(self, job_id: int, future: asyncio.Future) -> None:
+        """
+        Снимает задачу из очереди или прерывает её в дочернем процессе.
+        """
+        future.cancel()
+        if not _CAN_INTERRUPT:
+            return
+        for slot in range(self.workers):
+            if self._job_ids[slot] == job_id:
+                self._cancel_requests[slot] = job_id
+                try:
+                    os.kill(self._pids[slot], signal.SIGUSR1)
+                except ProcessLookupError:
+                    pass
+
+
+settings = get_settings()
+
+analysis_executor = AnalysisExecutor(
+    workers=settings.analysis_workers,
+    job_timeout=settings.analysis_job_timeout,
+    poll_interval=settings.analysis_poll_interval,
+    preload=("modules.get_book_intro.main", "modules.tags_extract.main"),
+)
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import PyPDF2
+from fastapi import UploadFile
+from multipart import MultipartParser
+from multipart.multipart import parse_options_header
+from starlette.requests import Request
+
+from configs.settings import get_settings
+
+settings = get_settings()
+
+
+# Предел на суммарный размер обычных (не файловых) полей формы
+MAX_FORM_FIELDS_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """
+    Загруженный файл превышает допустимый размер.
+    """
+
+
+class InvalidUpload(ValueError):
+    """
+    Тело запроса не является ожидаемой multipart-формой с одним файлом.
+    """
+
+
+@dataclass(frozen=True)
+class SpooledBook:
+    """
+    Загруженная книга, сохранённая на диск одним проходом.
+    """
+    path: str
+    sha256: str
+    size: int
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = settings.max_upload_bytes,
+                       chunk_size: int = settings.upload_chunk_size) -> SpooledBook:
+    """
+    Потоково копирует загрузку во временный файл, считая SHA-256 по ходу копирования.
+
+    В памяти одновременно находится не больше одного блока chunk_size.
+    Если файл больше max_bytes, копирование прерывается и выбрасывается UploadTooLarge.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(f"Файл больше допустимых {max_bytes} байт")
+
+    upload_dir = Path(settings.upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+
+    await file.seek(0)
+    target = tempfile.NamedTemporaryFile(dir=upload_dir, suffix=".pdf", delete=False)
+    try:
+        with target:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Файл больше допустимых {max_bytes} байт")
+                digest.update(chunk)
+                await asyncio.to_thread(target.write, chunk)
+    except BaseException:
+        os.remove(target.name)
+        raise
+
+    return SpooledBook(path=target.name, sha256=digest.hexdigest(), size=size)
+
+
+@dataclass(frozen=True)
+class StreamedUpload:
+    """
+    Файл и текстовые поля multipart-формы, прочитанные напрямую из тела запроса.
+    """
+    book: SpooledBook
+    filename: str
+    fields: dict[str, str]
+
+
+class _SingleFileForm:
+    """
+    Колбэки python-multipart: файл из поля field пишется на диск с подсчётом SHA-256,
+    остальные поля собираются в словарь.
+    """
+
+    def __init__(self, field: str, max_bytes: int, charset: str):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.charset = charset
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.filename: Optional[str] = None
+        self.fields: dict[str, str] = {}
+        self.pending: list[bytes] = []
+        self._fields_size = 0
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = ""
+        self._is_file = False
+        self._data = b""
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._name = ""
+        self._is_file = False
+        self._data = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise InvalidUpload("В части формы нет имени поля")
+        self._name = options[b"name"].decode(self.charset, errors="replace")
+        if b"filename" not in options:
+            return
+        if self._name != self.field or self.filename is not None:
+            raise InvalidUpload(f"Ожидается ровно один файл в поле {self.field}")
+        self._is_file = True
+        self.filename = options[b"filename"].decode(self.charset, errors="replace")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        chunk = data[start:end]
+        if self._is_file:
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(f"Файл больше допустимых {self.max_bytes} байт")
+            self.digest.update(chunk)
+            self.pending.append(chunk)
+            return
+        self._fields_size += len(chunk)
+        if self._fields_size > MAX_FORM_FIELDS_BYTES:
+            raise InvalidUpload("Слишком большие поля формы")
+        self._data += chunk
+
+    def on_part_end(self) -> None:
+        if not self._is_file:
+            self.fields[self._name] = self._data.decode(self.charset, errors="replace")
+
+
+async def stream_upload(request: Request, field: str = "file",
+                        max_bytes: int = settings.max_upload_bytes) -> StreamedUpload:
+    """
+    Разбирает multipart-тело запроса по мере поступления и пишет файл сразу во временный файл,
+    считая SHA-256 по ходу записи. В отличие от spool_upload, тело не буферизуется Starlette
+    и не копируется второй раз: на диск файл попадает одним проходом.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("Ожидается multipart/form-data")
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+    form = _SingleFileForm(field, max_bytes, charset)
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": form.on_part_begin,
+        "on_header_field": form.on_header_field,
+        "on_header_value": form.on_header_value,
+        "on_header_end": form.on_header_end,
+        "on_headers_finished": form.on_headers_finished,
+        "on_part_data": form.on_part_data,
+        "on_part_end": form.on_part_end,
+    })
+
+    upload_dir = Path(settings.upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    target = tempfile.NamedTemporaryFile(dir=upload_dir, suffix=".pdf", delete=False)
+    try:
+        with target:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if form.pending:
+                    await asyncio.to_thread(target.writelines, form.pending)
+                    form.pending = []
+            parser.finalize()
+        if form.filename is None:
+            raise InvalidUpload(f"В форме нет файла в поле {field}")
+    except BaseException:
+        os.remove(target.name)
+        raise
+
+    book = SpooledBook(path=target.name, sha256=form.digest.hexdigest(), size=form.size)
+    return StreamedUpload(book=book, filename=form.filename, fields=form.fields)
+
+
+def _hash_file(path: str, chunk_size: int) -> SpooledBook:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            size += len(chunk)
+            digest.update(chunk)
+    return SpooledBook(path=path, sha256=digest.hexdigest(), size=size)
+
+
+async def hash_file(path: str, chunk_size: int = settings.upload_chunk_size) -> SpooledBook:
+    """
+    Описание уже лежащего на диске файла без копирования.
+    Такой файл нельзя удалять через SpooledBook.remove — он принадлежит не нам.
+    """
+    return await asyncio.to_thread(_hash_file, path, chunk_size)
+
+
+@contextmanager
+def open_pdf(path: str) -> Iterator[PyPDF2.PdfReader]:
+    """
+    Открывает PDF поверх отображённого в память файла, не копируя его целиком.
+    """
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield PyPDF2.PdfReader(buffer)
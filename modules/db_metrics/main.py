@@ -0,0 +1,132 @@
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class LatencyWindow:
+    """
+    Счётчики длительностей: итоги за всё время и перцентили по последним window замерам.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._recent: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> dict:
+        recent = sorted(self._recent)
+        return {
+            "count": self.count,
+            "avg_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": _percentile(recent, 0.50),
+            "p95_seconds": _percentile(recent, 0.95),
+            "p99_seconds": _percentile(recent, 0.99),
+        }
+
+
+class PoolMetrics:
+    """
+    Метрики пула соединений: ожидание выдачи соединения, тайм-ауты и насыщение.
+    """
+
+    def __init__(self):
+        self.pool: Optional["InstrumentedAsyncPool"] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkout_wait = LatencyWindow()
+        self.queries = LatencyWindow()
+        self.timeouts = 0
+        self.max_checked_out = 0
+
+    def record_checkout(self, seconds: float) -> None:
+        self.checkout_wait.record(seconds)
+        if self.pool is not None:
+            self.max_checked_out = max(self.max_checked_out, self.pool.checkedout())
+
+    def stats(self) -> dict:
+        pool = self.pool
+        capacity = pool.size() + max(pool.max_overflow, 0) if pool is not None else 0
+        checked_out = pool.checkedout() if pool is not None else 0
+        return {
+            "size": pool.size() if pool is not None else 0,
+            "max_overflow": pool.max_overflow if pool is not None else 0,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin() if pool is not None else 0,
+            "overflow": pool.overflow() if pool is not None else 0,
+            # Доля занятых соединений от предела size + max_overflow
+            "saturation": checked_out / capacity if capacity else 0.0,
+            "max_saturation": self.max_checked_out / capacity if capacity else 0.0,
+            "timeouts": self.timeouts,
+            "checkout_wait": self.checkout_wait.summary(),
+            "queries": self.queries.summary(),
+        }
+
+
+db_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool, замеряющий время ожидания свободного соединения.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # У QueuePool этот предел доступен только через приватный атрибут
+        self.max_overflow = max_overflow
+        db_metrics.pool = self
+
+    def recreate(self):
+        pool = super().recreate()
+        db_metrics.pool = pool
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_metrics.timeouts += 1
+            raise
+        finally:
+            db_metrics.record_checkout(time.perf_counter() - started)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """
+    Подписывает движок на события курсора для замера длительности каждого запроса.
+    Для AsyncEngine передаётся engine.sync_engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        db_metrics.queries.record(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
@@ -1,28 +1,170 @@
 import asyncio
+import re
+from dataclasses import dataclass
+from typing import Optional
+
 import PyPDF2
+from PyPDF2.errors import PdfReadError
 from fastapi import UploadFile
+from starlette.requests import Request
+
+from configs.settings import get_settings
+from modules.analysis_executor.main import analysis_executor
+from modules.book_upload.main import open_pdf, spool_upload
+from modules.get_book_intro.page_extract import iter_page_texts
+from modules.text_normalizer.main import russian_words
+
+INTRO_KEYWORDS = ['введение', 'предисловие']
+TOC_KEYWORDS = ['оглавление', 'содержание']
+# Сколько страниц подряд, начиная с найденной, считается введением
+INTRO_PAGE_COUNT = 2
+# На сколько страниц номер в оглавлении может расходиться с индексом страницы в PDF
+TOC_PAGE_OFFSET = 3
+
+TOC_ENTRY_PATTERN = re.compile(r'(?:введение|предисловие)[^\n\d]*?(\d{1,4})\s*$', re.IGNORECASE | re.MULTILINE)
+# Заголовок оглавления отдельной строкой
+TOC_HEADING_PATTERN = re.compile(r'^\s*(?:оглавление|содержание)\s*$', re.IGNORECASE | re.MULTILINE)
+# Строка оглавления с отточием перед номером страницы: «Тема 1 ........ 15»
+TOC_LEADER_PATTERN = re.compile(r'(?:\.\s*){3,}\d{1,4}\s*$', re.MULTILINE)
+# Сколько строк с отточием достаточно, чтобы признать страницу оглавлением без заголовка
+TOC_MIN_LEADER_LINES = 3
+
+settings = get_settings()
+
+
+@dataclass
+class IntroLocation:
+    """
+    Найденное введение и способ, которым его нашли: outline, toc, scan или none.
+    """
+    pages: list[str]
+    strategy: str
+
+
+def _has_keyword(text: str, keywords: list[str]) -> bool:
+    text = text.lower()
+    return any(keyword in text for keyword in keywords)
+
+
+def _is_toc_page(text: str) -> bool:
+    """
+    Страница оглавления со строкой введения. Одного TOC_ENTRY_PATTERN мало: ему
+    соответствуют и колонтитул «Введение 5», и строка «введение в 1998» в тексте.
+    """
+    if not TOC_ENTRY_PATTERN.search(text):
+        return False
+    return bool(TOC_HEADING_PATTERN.search(text)) or len(TOC_LEADER_PATTERN.findall(text)) >= TOC_MIN_LEADER_LINES
+
+
+def _read_pages(pdf: PyPDF2.PdfReader, start: int) -> list[str]:
+    end = min(start + INTRO_PAGE_COUNT, len(pdf.pages))
+    return [pdf.pages[i].extract_text() for i in range(start, end)]
+
 
+def _find_in_outline(pdf: PyPDF2.PdfReader, outline=None) -> Optional[int]:
+    """
+    Индекс страницы закладки «Введение»/«Предисловие» или None.
+    """
+    if outline is None:
+        try:
+            outline = pdf.outline
+        except PdfReadError:
+            return None
+    for item in outline:
+        if isinstance(item, list):
+            index = _find_in_outline(pdf, item)
+        elif _has_keyword(item.title or '', INTRO_KEYWORDS):
+            index = pdf.get_destination_page_number(item)
+        else:
+            continue
+        if index is not None and index >= 0:
+            return index
+    return None
 
-async def get_book_intro(book: UploadFile) -> list[str]:
-    keywords = ['введение', 'предисловие']
-    pages = []
-    with book.file as file:
-        pdf = PyPDF2.PdfReader(file)
-        num_pages = len(pdf.pages)
-        for page_num in range(num_pages):
-            if len(pages) == 2:
-                break
-            page = pdf.pages[page_num]
-            text = page.extract_text()
-            for keyword in keywords:
-                if keyword in text.lower():
-                    pages.append(text)
+
+def _find_by_toc(pdf: PyPDF2.PdfReader, toc_text: str) -> Optional[int]:
+    """
+    Индекс страницы введения по номеру из оглавления.
+
+    Печатный номер страницы обычно смещён относительно индекса в PDF на обложку
+    и титульные листы, поэтому проверяются соседние страницы.
+    """
+    match = TOC_ENTRY_PATTERN.search(toc_text)
+    if not match:
+        return None
+    expected = int(match.group(1)) - 1
+    candidates = [expected + shift for shift in range(0, TOC_PAGE_OFFSET + 1)]
+    candidates += [expected - shift for shift in range(1, TOC_PAGE_OFFSET + 1)]
+    for index in candidates:
+        if 0 <= index < len(pdf.pages) and _has_keyword(pdf.pages[index].extract_text(), INTRO_KEYWORDS):
+            return index
+    return None
+
+
+def locate_intro(pdf: PyPDF2.PdfReader, path: str, head_pages: int = settings.intro_scan_head_pages,
+                 tail_pages: int = settings.intro_scan_tail_pages) -> IntroLocation:
+    """
+    Находит введение, извлекая текст ограниченного числа страниц.
+
+    1. outline — закладка PDF с названием введения;
+    2. toc — строка введения на странице оглавления;
+    3. scan — первая страница с упоминанием введения среди первых head_pages
+       и последних tail_pages страниц, кроме страниц оглавления; при pdf_extract_workers > 1 страницы
+       извлекаются параллельно.
+    """
+    index = _find_in_outline(pdf)
+    if index is not None:
+        return IntroLocation(_read_pages(pdf, index), 'outline')
+
+    num_pages = len(pdf.pages)
+    scan_order = list(range(min(head_pages, num_pages)))
+    scan_order += list(range(max(head_pages, num_pages - tail_pages), num_pages))
+    for page_num, text in iter_page_texts(pdf, path, scan_order):
+        if _has_keyword(text, TOC_KEYWORDS):
+            index = _find_by_toc(pdf, text)
+            if index is not None:
+                return IntroLocation(_read_pages(pdf, index), 'toc')
+        # Оглавление упоминает введение, но само им не является
+        if _has_keyword(text, INTRO_KEYWORDS) and not _is_toc_page(text):
+            return IntroLocation(_read_pages(pdf, page_num), 'scan')
+    return IntroLocation([], 'none')
+
+
+def read_book_intro(path: str) -> list[str]:
+    """
+    Синхронное извлечение введения, выполняется в пуле процессов.
+    """
+    with open_pdf(path) as pdf:
+        pages = locate_intro(pdf, path).pages
     if not pages:
         raise ValueError("В книге нет введения или предисловия.")
-
     return pages
 
 
+def get_book_intro_text(path: str) -> tuple[Optional[str], str]:
+    """
+    Текст введения, очищенный до русских слов, и стратегия поиска.
+    Текст равен None, если PDF не читается или введения нет.
+    """
+    try:
+        with open_pdf(path) as pdf:
+            location = locate_intro(pdf, path)
+    except (PdfReadError, ValueError):
+        # ValueError — пустой файл, который нельзя отобразить в память
+        return None, 'none'
+    if not location.pages:
+        return None, location.strategy
+    return russian_words(location.pages), location.strategy
+
+
+async def get_book_intro(book: UploadFile, request: Optional[Request] = None) -> list[str]:
+    upload = await spool_upload(book)
+    try:
+        return await analysis_executor.run(read_book_intro, upload.path, request=request)
+    finally:
+        upload.remove()
+
+
 async def main():
     pass
 
@@ -0,0 +1,67 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Sequence
+
+import PyPDF2
+
+from configs.settings import get_settings
+from modules.book_upload.main import open_pdf
+
+settings = get_settings()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _extract_chunk(path: str, page_numbers: Sequence[int]) -> list[str]:
+    """
+    Извлекает текст страниц в дочернем процессе; файл открывается через mmap,
+    поэтому все процессы читают одни и те же страницы памяти.
+    """
+    with open_pdf(path) as pdf:
+        return [pdf.pages[i].extract_text() for i in page_numbers]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def iter_page_texts(pdf: PyPDF2.PdfReader, path: str, page_numbers: Sequence[int],
+                    workers: int = settings.pdf_extract_workers,
+                    chunk_size: int = settings.pdf_extract_chunk_size,
+                    min_pages: int = settings.pdf_extract_parallel_min_pages) -> Iterator[tuple[int, str]]:
+    """
+    Выдаёт (номер страницы, текст) в порядке page_numbers.
+
+    При workers > 1 и не меньше min_pages страниц они извлекаются волнами по
+    workers * chunk_size страниц: каждая волна делится на куски по chunk_size
+    и обрабатывается параллельно, поэтому вызывающий код может остановиться после
+    первой подходящей волны. Каждый кусок заново разбирает PDF, поэтому на коротких
+    списках страниц последовательное извлечение быстрее.
+    """
+    page_numbers = list(page_numbers)
+    if workers <= 1 or len(page_numbers) < max(min_pages, chunk_size + 1):
+        for page_num in page_numbers:
+            yield page_num, pdf.pages[page_num].extract_text()
+        return
+
+    pool = _get_pool(workers)
+    wave_size = workers * chunk_size
+    futures = []
+    try:
+        for wave_start in range(0, len(page_numbers), wave_size):
+            wave = page_numbers[wave_start:wave_start + wave_size]
+            chunks = [wave[i:i + chunk_size] for i in range(0, len(wave), chunk_size)]
+            futures = [pool.submit(_extract_chunk, path, chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                yield from zip(chunk, future.result())
+    finally:
+        # Вызывающий код остановился раньше: куски волны, которые ещё не начались, не нужны
+        for future in futures:
+            future.cancel()
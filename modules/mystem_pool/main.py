@@ -0,0 +1,184 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from pymystem3 import Mystem
+
+from configs.settings import get_settings
+
+
+class MystemPoolOverloaded(Exception):
+    """
+    Пул перегружен: очередь ожидания заполнена или истекло время ожидания.
+    """
+
+
+class MystemPool:
+    """
+    Пул долгоживущих процессов mystem, общий для всего приложения.
+
+    Процессы запускаются один раз и переиспользуются между запросами.
+    Если все процессы заняты, запрос ждёт в очереди; при переполнении
+    очереди или истечении таймаута выбрасывается MystemPoolOverloaded.
+    Упавшие процессы перезапускаются при выдаче из пула и фоновой проверкой.
+    """
+
+    def __init__(self, size: int, max_waiting: int, acquire_timeout: float, health_interval: float):
+        self.size = size
+        self.max_waiting = max_waiting
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: list[Mystem] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+        self._busy = 0
+        self._waiting = 0
+        self._acquired_total = 0
+        self._rejected_total = 0
+        self._restarts_total = 0
+        self._wait_seconds_total = 0.0
+        self._busy_seconds_total = 0.0
+        self._started_at: Optional[float] = None
+
+    async def start(self) -> None:
+        """
+        Запускает процессы mystem и фоновую проверку их состояния.
+        """
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            idle = asyncio.Queue()
+            for _ in range(self.size):
+                worker = await asyncio.to_thread(self._spawn)
+                self._workers.append(worker)
+                idle.put_nowait(worker)
+            self._idle = idle
+            self._started_at = time.monotonic()
+            if self.health_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """
+        Останавливает фоновую проверку и завершает все процессы mystem.
+        """
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for worker in self._workers:
+            await asyncio.to_thread(worker.close)
+        self._workers = []
+        self._idle = None
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Mystem]:
+        """
+        Выдаёт исправный процесс mystem на время блока и возвращает его в пул.
+        """
+        if self._idle is None:
+            await self.start()
+
+        if self._idle.empty() and self._waiting >= self.max_waiting:
+            self._rejected_total += 1
+            raise MystemPoolOverloaded("Очередь ожидания mystem заполнена")
+
+        self._waiting += 1
+        started = time.monotonic()
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._rejected_total += 1
+            raise MystemPoolOverloaded("Истекло время ожидания свободного процесса mystem")
+        finally:
+            self._waiting -= 1
+            self._wait_seconds_total += time.monotonic() - started
+
+        self._busy += 1
+        self._acquired_total += 1
+        borrowed = time.monotonic()
+        try:
+            if not self._is_alive(worker):
+                await self._restart(worker)
+            yield worker
+        finally:
+            self._busy -= 1
+            self._busy_seconds_total += time.monotonic() - borrowed
+            self._idle.put_nowait(worker)
+
+    async def lemmatize(self, text: str) -> list[str]:
+        """
+        Лемматизация текста на свободном процессе пула.
+        """
+        async with self.acquire() as worker:
+            try:
+                return await asyncio.to_thread(worker.lemmatize, text)
+            except (BrokenPipeError, RuntimeError):
+                # Процесс упал посреди запроса — перезапускаем и повторяем один раз
+                await self._restart(worker)
+                return await asyncio.to_thread(worker.lemmatize, text)
+
+    def metrics(self) -> dict:
+        """
+        Метрики загрузки пула.
+        """
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        capacity_seconds = uptime * self.size
+        return {
+            "size": self.size,
+            "busy": self._busy,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "acquired_total": self._acquired_total,
+            "rejected_total": self._rejected_total,
+            "restarts_total": self._restarts_total,
+            "avg_wait_seconds": self._wait_seconds_total / self._acquired_total if self._acquired_total else 0.0,
+            "utilization": self._busy_seconds_total / capacity_seconds if capacity_seconds else 0.0,
+        }
+
+    @staticmethod
+    def _spawn() -> Mystem:
+        worker = Mystem()
+        worker.start()
+        return worker
+
+    @staticmethod
+    def _is_alive(worker: Mystem) -> bool:
+        process = worker._proc
+        return process is not None and process.poll() is None
+
+    async def _restart(self, worker: Mystem) -> None:
+        await asyncio.to_thread(worker.close)
+        await asyncio.to_thread(worker.start)
+        self._restarts_total += 1
+
+    async def _health_loop(self) -> None:
+        """
+        Периодически проверяет простаивающие процессы и перезапускает упавшие.
+        Занятые процессы проверяются при следующей выдаче из пула.
+        """
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for _ in range(self._idle.qsize()):
+                try:
+                    worker = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    if not self._is_alive(worker):
+                        await self._restart(worker)
+                finally:
+                    self._idle.put_nowait(worker)
+
+
+settings = get_settings()
+
+mystem_pool = MystemPool(
+    size=settings.mystem_pool_size,
+    max_waiting=settings.mystem_pool_max_waiting,
+    acquire_timeout=settings.mystem_pool_acquire_timeout,
+    health_interval=settings.mystem_pool_health_interval,
+)
@@ -0,0 +1,124 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from configs.settings import get_settings
+
+settings = get_settings()
+
+# Заголовок с курсором следующей страницы; на последней странице не передаётся
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidPageRequest(ValueError):
+    """
+    Неверный курсор, размер страницы или список полей.
+    """
+
+
+@dataclass
+class PageRequest:
+    """
+    Запрос страницы: id последней записи предыдущей страницы, размер и запрошенные поля.
+    """
+    after: Optional[int]
+    limit: int
+    fields: Optional[list[str]] = None
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str]
+    projected: bool = False
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidPageRequest("Неверный курсор")
+    if not isinstance(last_id, int):
+        raise InvalidPageRequest("Неверный курсор")
+    return last_id
+
+
+def page_request(cursor: Optional[str], limit: Optional[int], fields: Optional[str],
+                 allowed_fields: Sequence[str]) -> PageRequest:
+    """
+    Разбирает параметры запроса. Размер страницы ограничивается page_size_max;
+    fields — имена через запятую, поля книги пишутся как book.<поле>.
+    """
+    if limit is None:
+        limit = settings.page_size_default
+    if limit < 1:
+        raise InvalidPageRequest("Размер страницы должен быть положительным")
+    limit = min(limit, settings.page_size_max)
+
+    requested = None
+    if fields:
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in allowed_fields]
+        if unknown:
+            raise InvalidPageRequest(f"Неизвестные поля: {', '.join(unknown)}")
+        # id нужен для курсора и всегда возвращается
+        if "id" not in requested:
+            requested.insert(0, "id")
+
+    return PageRequest(after=decode_cursor(cursor) if cursor else None, limit=limit, fields=requested)
+
+
+def apply_keyset(query, id_column, page: PageRequest):
+    """
+    Добавляет к запросу условие и порядок по ключу; выбирается на одну запись больше,
+    чтобы понять, есть ли следующая страница.
+    """
+    if page.after is not None:
+        query = query.where(id_column > page.after)
+    return query.order_by(id_column).limit(page.limit + 1)
+
+
+def make_page(rows: Sequence[Any], page: PageRequest) -> Page:
+    """
+    Страница из строк apply_keyset: лишняя строка отбрасывается и даёт курсор.
+    Строки проекции превращаются в словари; поля вида book.tags — во вложенные.
+    """
+    items = list(rows[:page.limit])
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > page.limit else None
+    if page.fields is None:
+        return Page(items=items, next_cursor=next_cursor)
+    return Page(items=[_nest(row._mapping) for row in items], next_cursor=next_cursor, projected=True)
+
+
+def page_response(page: Page, schema: Optional[type[BaseModel]] = None) -> JSONResponse:
+    """
+    JSON-ответ со страницей и курсором в заголовке. Целые записи сериализуются
+    через schema, проекция отдаётся как есть.
+    """
+    if schema is not None and not page.projected:
+        content = [schema.model_validate(item, from_attributes=True).model_dump(mode="json") for item in page.items]
+    else:
+        content = jsonable_encoder(page.items)
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return JSONResponse(content=content, headers=headers)
+
+
+def _nest(mapping) -> dict:
+    result = {}
+    for key, value in mapping.items():
+        target = result
+        *parents, name = key.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[name] = value
+    return result
@@ -0,0 +1,204 @@
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from configs.settings import get_settings
+from modules.cache.main import LRUCache
+
+
+@dataclass
+class CachedRecommendations:
+    """
+    Рекомендации для одной книги по всем запрошенным top_n и теги, по которым они посчитаны.
+    """
+    tags: frozenset[str]
+    stored_at: float = field(default_factory=time.time)
+    results: dict[int, Any] = field(default_factory=dict)
+
+
+class LocalBackend:
+    """
+    Кэш в памяти процесса: LRU с временем жизни и обратный индекс тег → книги.
+
+    Индекс содержит только книги, записи которых ещё лежат в LRU: при вытеснении,
+    истечении ttl, перезаписи с другими тегами и сбросе книга убирается из множеств
+    своих тегов, поэтому индекс не растёт больше maxsize записей.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl, on_evict=self._on_evict)
+        self.books_by_tag: dict[str, set[int]] = defaultdict(set)
+
+    async def get(self, book_id: int, top_n: int) -> Optional[tuple[Any, float]]:
+        entry = self.entries.get(book_id)
+        if entry is None or top_n not in entry.results:
+            return None
+        return entry.results[top_n], entry.stored_at
+
+    async def set(self, book_id: int, top_n: int, tags: Iterable[str], value: Any) -> None:
+        if self.entries.maxsize <= 0:
+            return
+        entry = self.entries.get(book_id)
+        tags = frozenset(tags)
+        if entry is not None and entry.tags != tags:
+            self._unindex(book_id, entry.tags - tags)
+            entry = None
+        if entry is None:
+            entry = CachedRecommendations(tags=tags)
+        entry.results[top_n] = value
+        self.entries.set(book_id, entry)
+        for tag in tags:
+            self.books_by_tag[tag].add(book_id)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in set(tags):
+            for book_id in self.books_by_tag.pop(tag, set()):
+                removed += await self.invalidate_book(book_id)
+        return removed
+
+    async def invalidate_book(self, book_id: int) -> int:
+        entry = self.entries.pop(book_id)
+        if entry is None:
+            return 0
+        self._unindex(book_id, entry.tags)
+        return 1
+
+    def _on_evict(self, book_id: int, entry: CachedRecommendations) -> None:
+        self._unindex(book_id, entry.tags)
+
+    def _unindex(self, book_id: int, tags: Iterable[str]) -> None:
+        for tag in tags:
+            books = self.books_by_tag.get(tag)
+            if books is None:
+                continue
+            books.discard(book_id)
+            if not books:
+                del self.books_by_tag[tag]
+
+    def size(self) -> int:
+        return self.entries.stats()["size"]
+
+
+class RedisBackend:
+    """
+    Общий для всех процессов кэш в Redis: хэш recs:{book_id} с полями top_n
+    и множества recs:tag:{tag} с id книг. Нужен пакет redis.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "recs"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _book_key(self, book_id: int) -> str:
+        return f"{self.prefix}:{book_id}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    async def get(self, book_id: int, top_n: int) -> Optional[tuple[Any, float]]:
+        raw = await self.client.hget(self._book_key(book_id), str(top_n))
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return payload["value"], payload["stored_at"]
+
+    async def set(self, book_id: int, top_n: int, tags: Iterable[str], value: Any) -> None:
+        key = self._book_key(book_id)
+        payload = json.dumps({"value": value, "stored_at": time.time()}, ensure_ascii=False)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, str(top_n), payload)
+            pipe.expire(key, self.ttl)
+            for tag in set(tags):
+                pipe.sadd(self._tag_key(tag), book_id)
+                pipe.expire(self._tag_key(tag), self.ttl)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tag_keys = [self._tag_key(tag) for tag in set(tags)]
+        if not tag_keys:
+            return 0
+        book_ids = await self.client.sunion(tag_keys)
+        await self.client.delete(*tag_keys)
+        if not book_ids:
+            return 0
+        return await self.client.delete(*(self._book_key(int(book_id)) for book_id in book_ids))
+
+    async def invalidate_book(self, book_id: int) -> int:
+        return await self.client.delete(self._book_key(book_id))
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class RecommendationCache:
+    """
+    Кэш готовых рекомендаций по (id книги, top_n).
+
+    Запись живёт не дольше ttl секунд. Новый отзыв или новая книга сбрасывают
+    только записи книг, у которых есть общий тег с изменившейся книгой: лишь
+    среди них могут появиться или сдвинуться кандидаты. Смещение глобального
+    среднего рейтинга на остальные записи учитывается через ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.backend = RedisBackend(redis_url, ttl) if redis_url else LocalBackend(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+    async def get(self, book_id: int, top_n: int) -> Optional[Any]:
+        cached = await self.backend.get(book_id, top_n)
+        if cached is None:
+            self.misses += 1
+            return None
+        value, stored_at = cached
+        age = max(0.0, time.time() - stored_at)
+        self.hits += 1
+        self._served_age_total += age
+        self._served_age_max = max(self._served_age_max, age)
+        return value
+
+    async def set(self, book_id: int, top_n: int, tags: Iterable[str], value: Any) -> None:
+        await self.backend.set(book_id, top_n, tags, value)
+
+    async def invalidate(self, tags: Iterable[str] = (), book_id: Optional[int] = None) -> None:
+        """
+        Сбрасывает записи книг с общими тегами и, если указана, запись самой книги.
+        """
+        removed = await self.backend.invalidate_tags(tags or ())
+        if book_id is not None:
+            removed += await self.backend.invalidate_book(book_id)
+        self.invalidations += removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            # Возраст отданных из кэша результатов, секунды
+            "served_age_avg": self._served_age_total / self.hits if self.hits else 0.0,
+            "served_age_max": self._served_age_max,
+        }
+
+
+settings = get_settings()
+
+recommendation_cache = RecommendationCache(
+    maxsize=settings.recommendation_cache_size,
+    ttl=settings.recommendation_cache_ttl,
+    redis_url=settings.recommendation_cache_redis_url,
+)
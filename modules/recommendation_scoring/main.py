@@ -0,0 +1,108 @@
+import datetime
+from dataclasses import dataclass
+from math import exp, pi, sin
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+@dataclass
+class CandidateColumns:
+    """
+    Колоночный снимок кандидатов в рекомендации: по одному массиву на признак.
+    """
+    rating_count: np.ndarray
+    average_rating: np.ndarray
+    delta_days: np.ndarray
+    tag_weight: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rating_count)
+
+
+def tag_position_weights(current_tags: Sequence[str]) -> dict[str, float]:
+    """
+    Синусный вес тега текущей книги по позиции его первого вхождения:
+    первый тег весит 1, вес последнего близок к нулю.
+    """
+    n = len(current_tags)
+    weights = {}
+    for index, tag in enumerate(current_tags):
+        if tag not in weights:
+            weights[tag] = sin((pi / 2) * (n - index) / n)
+    return weights
+
+
+def build_columns(rows: Iterable[tuple[int, float, datetime.datetime, Sequence[str]]],
+                  current_tags: Sequence[str], now: datetime.datetime) -> CandidateColumns:
+    """
+    Снимок по строкам (rating_count, average_rating, time, tags).
+    """
+    weights = tag_position_weights(current_tags)
+    current = frozenset(weights)
+    rating_count, average_rating, delta_days, tag_weight = [], [], [], []
+    for count, average, time, tags in rows:
+        rating_count.append(count)
+        average_rating.append(average)
+        delta_days.append((now - time).days)
+        tag_weight.append(sum(map(weights.__getitem__, current.intersection(tags))) if tags else 0.0)
+    return CandidateColumns(
+        rating_count=np.asarray(rating_count, dtype=np.float64),
+        average_rating=np.asarray(average_rating, dtype=np.float64),
+        delta_days=np.asarray(delta_days, dtype=np.int64),
+        tag_weight=np.asarray(tag_weight, dtype=np.float64),
+    )
+
+
+def score_candidates(columns: CandidateColumns, tags_count: int, global_avg_rating: float, k: float,
+                     max_popularity: int, tag_coefficient: float, popularity_coefficient: float,
+                     rating_coefficient: float, time_coefficient: float, time_decay_alpha: float) -> np.ndarray:
+    """
+    Итоговые веса всех кандидатов; формулы и порядок операций те же, что в поштучном расчёте.
+    """
+    # Схожесть тегов
+    max_possible_tag_weight = tags_count * sin(pi / 2)
+    normalized_tag_weight = (columns.tag_weight / max_possible_tag_weight) * 5
+
+    # Популярность
+    if max_popularity > 0:
+        normalized_popularity_weight = (columns.rating_count / max_popularity) * 5
+    else:
+        normalized_popularity_weight = np.zeros(len(columns))
+
+    # Взвешенный рейтинг; при rating_count + k == 0 оценок нет вовсе и берётся глобальное среднее
+    denominator = columns.rating_count + k
+    has_ratings = denominator != 0
+    own_share = np.divide(columns.rating_count, denominator, out=np.zeros(len(columns)), where=has_ratings)
+    global_share = np.divide(k, denominator, out=np.ones(len(columns)), where=has_ratings)
+    weighted_rating = own_share * columns.average_rating + global_share * global_avg_rating
+
+    # Актуальность: различных возрастов в днях немного, экспонента считается для каждого один раз
+    days, inverse = np.unique(columns.delta_days, return_inverse=True)
+    decay = np.array([exp(-time_decay_alpha * int(d)) for d in days], dtype=np.float64)
+    normalized_time_weight = decay[inverse] * 5
+
+    return (
+        normalized_tag_weight * tag_coefficient +
+        normalized_popularity_weight * popularity_coefficient +
+        weighted_rating * rating_coefficient +
+        normalized_time_weight * time_coefficient
+    )
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Индексы k лучших весов по убыванию; при равных весах раньше идёт меньший индекс,
+    как при устойчивой сортировке всего списка.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        chosen = np.arange(n)
+    else:
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
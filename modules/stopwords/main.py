@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from configs.settings import get_settings
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+TAGS_EXTRACT_DIR = ROOT_DIR / "modules" / "tags_extract"
+
+logger = logging.getLogger(__name__)
+
+STOPWORD_FILES = {
+    "common": ROOT_DIR / "stopwords.txt",
+    "tags": TAGS_EXTRACT_DIR / "stopwords.json",
+    "noun": TAGS_EXTRACT_DIR / "noun_stopwords.json",
+    "adj": TAGS_EXTRACT_DIR / "adj_stopwords.json",
+    "verb": TAGS_EXTRACT_DIR / "verb_stopwords.json",
+}
+
+
+class StopwordRegistry:
+    """
+    Реестр списков стоп-слов, общий для всех анализаторов.
+
+    Каждый список загружается один раз в неизменяемый frozenset, поэтому
+    проверка вхождения выполняется за O(1). Не чаще раза в check_interval секунд
+    реестр сверяет время изменения файлов и перечитывает изменившиеся.
+    Если изменённый файл не читается, продолжает отдаваться прежний список.
+    """
+
+    def __init__(self, files: dict[str, Path], check_interval: float):
+        self.files = files
+        self.check_interval = check_interval
+        self._sets: dict[str, frozenset[str]] = {}
+        self._versions: dict[str, str] = {}
+        self._mtimes: dict[str, int] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        for name in files:
+            self._load(name)
+
+    def get(self, name: str) -> frozenset[str]:
+        """
+        Возвращает список стоп-слов по имени: common, tags, noun, adj или verb.
+        """
+        self._reload_changed()
+        return self._sets[name]
+
+    def version(self, name: str) -> str:
+        """
+        Версия списка — хэш содержимого файла; меняется при любой правке списка.
+        """
+        self._reload_changed()
+        return self._versions[name]
+
+    def reload(self) -> None:
+        with self._lock:
+            for name in self.files:
+                self._try_load(name)
+
+    def _reload_changed(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            for name, path in self.files.items():
+                try:
+                    changed = os.stat(path).st_mtime_ns != self._mtimes[name]
+                except OSError as e:
+                    logger.warning("Не удалось проверить файл стоп-слов %s: %s", path, e)
+                    continue
+                if changed:
+                    self._try_load(name)
+
+    def _try_load(self, name: str) -> None:
+        """
+        Перечитывает список; при ошибке оставляет прежний и повторит попытку при следующей проверке.
+        """
+        try:
+            self._load(name)
+        except (OSError, ValueError):
+            logger.exception("Не удалось перечитать стоп-слова %s, используется прежний список",
+                             self.files[name])
+
+    def _load(self, name: str) -> None:
+        path = self.files[name]
+        mtime = os.stat(path).st_mtime_ns
+        raw = path.read_bytes()
+        content = raw.decode("utf-8")
+        if path.suffix == ".json":
+            words = frozenset(json.loads(content))
+        else:
+            words = frozenset(word.strip() for word in content.splitlines())
+        # Время изменения запоминается только после успешного разбора файла
+        self._sets[name] = words
+        self._versions[name] = hashlib.sha256(raw).hexdigest()[:16]
+        self._mtimes[name] = mtime
+
+
+settings = get_settings()
+
+stopword_registry = StopwordRegistry(STOPWORD_FILES, settings.stopwords_reload_interval)
@@ -1,127 +1,110 @@
 import asyncio
-import json
+import logging
 import re
-from pathlib import Path
+from typing import Optional
 
 import nltk
-import pymorphy3
+from spacy.tokens import Doc
+from starlette.requests import Request
+
+from configs.settings import get_settings
+from modules.analysis_executor.main import analysis_executor
+from modules.stopwords.main import stopword_registry
+from modules.tags_extract.morph_cache import morph_cache
 from modules.tags_extract.yake_impl import Yake
-import string
+from modules.text_normalizer.main import keywords_normalizer
 from nltk import ngrams
 from sklearn.feature_extraction.text import TfidfVectorizer
 import spacy
 from natasha import NamesExtractor, MorphVocab
 
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
 morph_vocab = MorphVocab()
 names_extractor = NamesExtractor(morph_vocab)
-nlp = spacy.load("ru_core_news_sm")
-morph = pymorphy3.MorphAnalyzer(lang='ru')
+# Леммы spaCy не используются: нормальные формы берутся из pymorphy3
+nlp = spacy.load("ru_core_news_sm", disable=settings.spacy_disabled_components)
 vectorizer = TfidfVectorizer()
 yake = Yake()
 
-with open(Path(__file__).resolve().parent / "stopwords.json", 'r', encoding='utf-8') as file:
-    stopwords = set(json.loads(file.read())) | set(string.punctuation)
-
-with open(Path(__file__).resolve().parent / "noun_stopwords.json", 'r', encoding='utf-8') as file:
-    noun_stopwords = set(json.loads(file.read()))
-
-with open(Path(__file__).resolve().parent / "adj_stopwords.json", 'r', encoding='utf-8') as file:
-    adj_stopwords = set(json.loads(file.read()))
-
-with open(Path(__file__).resolve().parent / "verb_stopwords.json", 'r', encoding='utf-8') as file:
-    verb_stopwords = set(json.loads(file.read()))
 
+def process_text(text: str):
+    return keywords_normalizer.normalize(text)
 
-async def process_text(text: str):
-    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+)\s?-\n([а-яё]+)", r"\1\2", text, flags=re.IGNORECASE)
-    text = re.sub(r"\s?([а-яё]+[аеёиоуыэюя])\s?-\s?([бвгджзйклмнпрстфхцчшщ][а-яё]+)\s?", r" \1\2 ", text,
-                  flags=re.IGNORECASE)
-    text = re.sub(r"\s([а-яё]{2}) ([а-яё])-\s([а-яё]+) ([аеёиоуыэюя]{2})\s", r" \1\2\3\4 ", text, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+) ые ", r"\1ые ", text, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+) ая ", r"\1ая ", text, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+) ях ", r"\1ях ", text, flags=re.IGNORECASE)
-    text = re.sub(r" ([мргнтчфждлхз]) ([а-яё]+)", r"\1\2 ", text, flags=re.IGNORECASE)
-    text = re.sub(r" п ри-", r"при", text, flags=re.IGNORECASE)
-    text = re.sub("\n|«|»|–|…|\d{1}|гг\.", '', text)
-    text = re.sub("предисловие", '', text, flags=re.IGNORECASE)
-    text = re.sub("количе ство", 'количество', text, flags=re.IGNORECASE)
-    text = re.sub(" {2,}|\.{2,}", ' ', text)
-    return text.strip()
 
-
-async def get_words_from_brackets(text: str) -> list[str]:
+def get_words_from_brackets(text: str) -> list[str]:
     words = re.findall(r"«([а-яa-zё ]+)»", text, flags=re.IGNORECASE)
     return words
 
 
-async def get_nlp_keywords(text: str) -> set[str]:
+def parse_sentences(text: str) -> list[Doc]:
+    """
+    Один проход spaCy по тексту: предложения обрабатываются пачками через nlp.pipe.
+    """
     sents = nltk.sent_tokenize(text)
+    return list(nlp.pipe(sents, batch_size=settings.spacy_batch_size, n_process=settings.spacy_n_process))
+
+
+def get_nlp_keywords(docs: list[Doc]) -> set[str]:
+    noun_stopwords = stopword_registry.get("noun")
+    adj_stopwords = stopword_registry.get("adj")
+    verb_stopwords = stopword_registry.get("verb")
     phrases = set()
-    for s in sents:
-        doc = nlp(s)
+    for doc in docs:
         for i, token in enumerate(
                 doc[:-2]):
             if token.pos_ == "ADJ" and doc[i + 1].pos_ == "NOUN" and token.text.lower() not in adj_stopwords \
                     and doc[i + 1].text.lower() not in noun_stopwords:
                 # Прилагательное + существительное
-                print('=' * 10)
-                print('Прилагательное + существительное')
-                print(f"{token.text} {doc[i + 1].text}")
-                print('=' * 10)
+                logger.debug("Прилагательное + существительное: %s %s", token.text, doc[i + 1].text)
                 phrases.add(f"{token.text} {doc[i + 1].text}")
             elif token.pos_ == "VERB" and doc[i + 1].pos_ == "ADJ" and doc[i + 2].pos_ == "NOUN" \
                     and token.text.lower() not in verb_stopwords and doc[i + 1].text.lower() not in adj_stopwords \
                     and doc[i + 2].text.lower() not in noun_stopwords:
                 # Глагол + прилагательное + существительное
-                print('=' * 10)
-                print('Глагол + прилагательное + существительное')
-                print(f"{token.text} {doc[i + 1].text} {doc[i + 2].text}")
-                print('=' * 10)
+                logger.debug("Глагол + прилагательное + существительное: %s %s %s",
+                             token.text, doc[i + 1].text, doc[i + 2].text)
                 phrases.add(f"{token.text} {doc[i + 1].text} {doc[i + 2].text}")
             elif token.pos_ == "NOUN" and doc[i + 1].pos_ == "PROPN" \
                     and token.text.lower() not in noun_stopwords and doc[i + 1].text.lower() not in noun_stopwords:
                 # Существительное + имя собственное
-                print('=' * 10)
-                print('Существительное + имя собственное')
-                print(f"{token.text} {doc[i + 1].text}")
-                print('=' * 10)
+                logger.debug("Существительное + имя собственное: %s %s", token.text, doc[i + 1].text)
                 phrases.add(f"{token.text} {doc[i + 1].text}")
             elif token.pos_ == "VERB" and doc[i + 1].pos_ == "NOUN" and doc[i + 1].dep_ == "nmod" and \
-                    morph.parse(doc[i + 1].text)[0].tag.case == "gent" \
+                    morph_cache.parse(doc[i + 1].text).case == "gent" \
                     and token.text.lower() not in verb_stopwords and doc[i + 1].text.lower() not in noun_stopwords:
                 # Глагол + сущ в родительном падеже
-                print('=' * 10)
-                print('Глагол + сущ в родительном падеже')
-                print(f"{token.text} {doc[i + 1].text}")
-                print('=' * 10)
+                logger.debug("Глагол + сущ в родительном падеже: %s %s", token.text, doc[i + 1].text)
                 phrases.add(f"{token.text} {doc[i + 1].text}")
     return phrases
 
 
-async def get_keywords(text: str) -> list[str]:
+def extract_keywords(text: str) -> list[str]:
+    """
+    Синхронное извлечение ключевых слов, выполняется в пуле процессов.
+    """
     res = set()
-    text = await process_text(text)
-    names = await get_names(text)
-    words_from_brackets = await get_words_from_brackets(text)
+    text = process_text(text)
+    docs = parse_sentences(text)
+    names = get_names(docs)
+    words_from_brackets = get_words_from_brackets(text)
     res = res | set(names)
     res = res | set(words_from_brackets)
-    nlp_keywords = await get_nlp_keywords(text)
+    nlp_keywords = get_nlp_keywords(docs)
     yake_keywords = yake.generate_keywords(text, from_grams=3, n=5)
     res = res | set(nlp_keywords)
     res = res | set(yake_keywords)
-    print("#" * 10)
-    print(yake_keywords)
-    print("-" * 10)
-    print(nlp_keywords)
-    print("#" * 10)
+    logger.debug("Ключевые слова YAKE: %s; по шаблонам частей речи: %s", yake_keywords, nlp_keywords)
     return [_.lower() for _ in res]
 
 
-async def get_names(text: str) -> list[str]:
-    doc = nlp(text)
-    names = [ent.text for ent in doc.ents if ent.label_ == "PER"]
+async def get_keywords(text: str, request: Optional[Request] = None) -> list[str]:
+    return await analysis_executor.run(extract_keywords, text, request=request)
+
+
+def get_names(docs: list[Doc]) -> list[str]:
+    names = [ent.text for doc in docs for ent in doc.ents if ent.label_ == "PER"]
     return names
 
 
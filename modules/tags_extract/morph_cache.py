@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import pymorphy3
+
+from configs.settings import get_settings
+from modules.analysis_executor.main import register_worker_stats
+
+
+@dataclass(frozen=True)
+class MorphInfo:
+    """
+    Самый вероятный разбор словоформы pymorphy3.
+    """
+    word: str
+    normal_form: str
+    pos: Optional[str]
+    case: Optional[str]
+
+
+class MorphCache:
+    """
+    Ограниченный LRU-кэш разборов pymorphy3 по словоформе.
+
+    Частые словоформы в тексте книги повторяются сотни раз, поэтому
+    повторный разбор заменяется поиском в словаре. Кэш потокобезопасен.
+    При наличии warm_start_path при создании разбираются словоформы из файла
+    (по одной на строку, самые частые — первыми).
+    """
+
+    def __init__(self, maxsize: int, warm_start_path: Optional[str] = None):
+        self.morph = pymorphy3.MorphAnalyzer(lang='ru')
+        self.parse = lru_cache(maxsize=maxsize)(self._parse)
+        if warm_start_path:
+            self.warm_up(warm_start_path)
+
+    def _parse(self, token: str) -> MorphInfo:
+        item = self.morph.parse(token)[0]
+        return MorphInfo(item.word, item.normal_form, item.tag.POS, item.tag.case)
+
+    def warm_up(self, path: str) -> int:
+        """
+        Заполняет кэш словоформами из файла; возвращает число разобранных слов.
+
+        Берутся первые maxsize словоформ, и разбираются они от редких к частым:
+        так самые частые оказываются последними использованными и вытесняются из LRU последними.
+        """
+        maxsize = self.parse.cache_info().maxsize
+        tokens = []
+        with Path(path).open(encoding="utf-8") as file:
+            for line in file:
+                token = line.strip()
+                if token:
+                    tokens.append(token)
+                    if maxsize is not None and len(tokens) >= maxsize:
+                        break
+        for token in reversed(tokens):
+            self.parse(token)
+        return len(tokens)
+
+    def stats(self) -> dict:
+        info = self.parse.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": info.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self.parse.cache_clear()
+
+
+def merge_stats(stats: list[dict]) -> dict:
+    """
+    Сводная статистика кэшей нескольких процессов.
+    """
+    hits = sum(item["hits"] for item in stats)
+    misses = sum(item["misses"] for item in stats)
+    return {
+        "workers": len(stats),
+        "size": sum(item["size"] for item in stats),
+        "maxsize": sum(item["maxsize"] or 0 for item in stats),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+settings = get_settings()
+
+morph_cache = MorphCache(settings.morph_cache_size, settings.morph_cache_warm_start)
+register_worker_stats("morph_cache", morph_cache.stats)
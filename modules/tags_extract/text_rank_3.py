@@ -1,11 +1,11 @@
 import json
-import re
 import operator
+from typing import Optional
 
-import nltk
+from modules.stopwords.main import stopword_registry
+from modules.text_normalizer.main import rake_normalizer
 
-debug = False
-test = True
+Phrase = tuple[str, ...]
 
 
 def is_number(s):
@@ -16,104 +16,80 @@ def is_number(s):
         return False
 
 
-def load_stop_words(stop_word_file):
-    stop_words = []
+def load_stop_words(stop_word_file) -> frozenset[str]:
     with open(stop_word_file, 'r', encoding='utf-8') as file:
-        stop_words += json.loads(file.read())
-    return stop_words
-
-
-def separate_words(text, min_word_return_size):
-    splitter = re.compile('[^a-zA-Z0-9_\\+\\-/]')
-    words = []
-    for single_word in splitter.split(text):
-        current_word = single_word.strip().lower()
-        if len(current_word) > min_word_return_size and current_word != '' and not is_number(current_word):
-            words.append(current_word)
-    return words
-
-
-def split_sentences(text):
-    sentence_delimiters = re.compile(u'[.!?,;:\t\\\\"\\(\\)\\\'\u2019\u2013]|\\s\\-\\s')
-    sentences = sentence_delimiters.split(text)
-    return sentences
-
-
-def build_stop_word_regex(stop_word_file_path):
-    stop_word_list = load_stop_words(stop_word_file_path)
-    stop_word_regex_list = []
-    for word in stop_word_list:
-        word_regex = r'\b' + re.escape(word) + r'(?![\w-])'
-        stop_word_regex_list.append(word_regex)
-    print(stop_word_regex_list)
-    stop_word_pattern = re.compile('|'.join(stop_word_regex_list), re.IGNORECASE)
-    return stop_word_pattern
-
-
-def generate_candidate_keywords(sentence_list, stopword_pattern):
-    phrase_list = []
-    for s in sentence_list:
-        tmp = re.sub(stopword_pattern, '|', s.strip())
-        phrases = tmp.split("|")
-        for phrase in phrases:
-            phrase = phrase.strip().lower()
-            if phrase != "":
-                phrase_list.append(phrase)
-    return phrase_list
-
-
-def calculate_word_scores(phraseList):
+        return frozenset(word.lower() for word in json.loads(file.read()))
+
+
+def split_phrases(tokens: list[str], stop_words: frozenset[str]) -> list[Phrase]:
+    """
+    Кандидаты в ключевые фразы: серии подряд идущих токенов без стоп-слов.
+    Один проход по токенам с поиском каждого в хэш-множестве.
+    """
+    phrases = []
+    phrase = []
+    for token in tokens:
+        word = token.lower()
+        if word in stop_words:
+            if phrase:
+                phrases.append(tuple(phrase))
+            phrase = []
+        else:
+            phrase.append(word)
+    if phrase:
+        phrases.append(tuple(phrase))
+    return phrases
+
+
+def phrase_words(phrase: Phrase) -> list[str]:
+    return [word for word in phrase if not is_number(word)]
+
+
+def calculate_word_scores(phrase_list: list[Phrase]) -> dict[str, float]:
     word_frequency = {}
     word_degree = {}
-    for phrase in phraseList:
-        word_list = separate_words(phrase, 0)
-        word_list_length = len(word_list)
-        word_list_degree = word_list_length - 1
+    for phrase in phrase_list:
+        word_list = phrase_words(phrase)
+        word_list_degree = len(word_list) - 1
         for word in word_list:
-            word_frequency.setdefault(word, 0)
-            word_frequency[word] += 1
-            word_degree.setdefault(word, 0)
-            word_degree[word] += word_list_degree  # orig.
-    for item in word_frequency:
-        word_degree[item] = word_degree[item] + word_frequency[item]
-
-    word_score = {}
-    for item in word_frequency:
-        word_score.setdefault(item, 0)
-        word_score[item] = word_degree[item] / (word_frequency[item] * 1.0)  # orig.
-    return word_score
+            word_frequency[word] = word_frequency.get(word, 0) + 1
+            word_degree[word] = word_degree.get(word, 0) + word_list_degree
+    return {word: (word_degree[word] + frequency) / (frequency * 1.0) for word, frequency in word_frequency.items()}
 
 
-def generate_candidate_keyword_scores(phrase_list, word_score):
+def generate_candidate_keyword_scores(phrase_list: list[Phrase], word_score: dict[str, float]) -> dict[str, float]:
     keyword_candidates = {}
     for phrase in phrase_list:
-        keyword_candidates.setdefault(phrase, 0)
-        word_list = separate_words(phrase, 0)
-        candidate_score = 0
-        for word in word_list:
-            candidate_score += word_score[word]
-        keyword_candidates[phrase] = candidate_score
+        keyword_candidates[' '.join(phrase)] = sum(word_score[word] for word in phrase_words(phrase))
     return keyword_candidates
 
 
 def preprocess_text(t: str):
-    text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", t, flags=re.IGNORECASE)
-    text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", text, flags=re.IGNORECASE)
-    text = re.sub("[^а-яА-ЯЁёa-zA-Z]", " ", text)
-    text = re.sub(" {2,}", " ", text)
-    return text
+    return rake_normalizer.normalize(t)
 
 
 class Rake(object):
-    def __init__(self, stop_words_path):
+    """
+    RAKE: фразы между стоп-словами, оценка слова — степень / частота.
+
+    Без stop_words_path используется общий список "tags" из реестра стоп-слов.
+    """
+
+    def __init__(self, stop_words_path: Optional[str] = None):
         self.stop_words_path = stop_words_path
-        self.__stop_words_pattern = build_stop_word_regex(stop_words_path)
+        self.__stop_words = load_stop_words(stop_words_path) if stop_words_path is not None else None
+
+    @property
+    def stop_words(self) -> frozenset[str]:
+        if self.__stop_words is not None:
+            return self.__stop_words
+        return stopword_registry.get("tags")
 
     def run(self, text):
-        text = preprocess_text(text)
-        sentence_list = split_sentences(text)
+        # После нормализации в тексте только буквы и одиночные пробелы
+        tokens = preprocess_text(text).split()
 
-        phrase_list = generate_candidate_keywords(sentence_list, self.__stop_words_pattern)
+        phrase_list = split_phrases(tokens, self.stop_words)
 
         word_scores = calculate_word_scores(phrase_list)
 
@@ -123,21 +99,8 @@ class Rake(object):
         return sorted_keywords
 
 
-if test:
+if __name__ == '__main__':
     text = """
     Прежде чем решать задачу – прочитай условие.  \nЖак Адамар  \nПРЕДИСЛОВИЕ  \nРаздел «Арифметические основы ЭВМ» дисциплины «Дискретная м а-\nтематика» явля ется одним из первых специальных курсов, которые форм и-\nруют у студентов понимание  основополагающих вопросов организации \nЭВМ, принципы построения отдельных устройств ЭВМ, их взаимосвязь. Он \nдолжен сформировать начальные знания для лучшего понимания последу ю-\nщих спецдисциплин.  \nОсновная цель настоящего учебного пособия – помочь студенту, п ри-\nступившему к изучению арифметики ЭВМ, приобрести теоретические знания \nи практические навыки представления чисел и выполнения основных ари ф-\nметических операций.  \nРассматриваемый в пособии теоретический материал сопровождается \nбольшим количеством примеров, ч то делает более понятным излагаемый м а-\nтериал и упрощает выполнение домашних заданий.  \nСледует отметить, что в последние годы литература, освещающая ари ф-\nметику ЭВМ, не выпускалась. Пособие, в некоторой части, устраняет этот \nинформационный пробел.  \nВ Приложени ях приводятся варианты домашних заданий и именной о б-\nзор известных математиков, внесших вклад в формирование арифметики  как \nматематической науки.  \n  """
-    sentenceList = split_sentences(text)
-    stoppath = "stopwords.json"
-    stopwordpattern = build_stop_word_regex(stoppath)
-    phraseList = generate_candidate_keywords(sentenceList, stopwordpattern)
-    wordscores = calculate_word_scores(phraseList)
-    keywordcandidates = generate_candidate_keyword_scores(phraseList, wordscores)
-    # if debug: print(keywordcandidates)
-    sortedKeywords = sorted(keywordcandidates.items(), key=operator.itemgetter(1), reverse=True)
-    # if debug: print(sortedKeywords)
-    totalKeywords = len(sortedKeywords)
-    # if debug: print(totalKeywords)
-    # print(sortedKeywords[0:(totalKeywords // 3)])
-    rake = Rake("stopwords.json")
-    keywords = rake.run(text)
-    print(keywords)
+    rake = Rake()
+    print(rake.run(text))
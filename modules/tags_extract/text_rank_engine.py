@@ -0,0 +1,79 @@
+import numpy as np
+from scipy import sparse
+
+
+class TextRankEngine:
+    """
+    TextRank на разреженной матрице совместной встречаемости.
+
+    Граф строится за один проход по токенам: для каждого сдвига d < window_size
+    пары (токен, токен через d позиций) добавляются с весом 1 / d. PageRank
+    считается степенным методом через умножение разреженной матрицы на вектор.
+    """
+
+    def __init__(self, window_size: int = 3, damping: float = 0.85,
+                 max_iterations: int = 50, threshold: float = 0.0001):
+        self.window_size = window_size
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.threshold = threshold
+
+    def build_graph(self, tokens: list[str]) -> tuple[list[str], sparse.csr_matrix]:
+        """
+        Словарь в порядке первого появления и симметричная матрица весов рёбер.
+        """
+        vocab = list(dict.fromkeys(tokens))
+        index = {word: i for i, word in enumerate(vocab)}
+        ids = np.fromiter((index[token] for token in tokens), dtype=np.int64, count=len(tokens))
+
+        rows, cols, weights = [], [], []
+        for distance in range(1, self.window_size):
+            left, right = ids[:-distance], ids[distance:]
+            mask = left != right
+            rows.append(left[mask])
+            cols.append(right[mask])
+            weights.append(np.full(int(mask.sum()), 1.0 / distance))
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        weights = np.concatenate(weights) if weights else np.empty(0)
+        # Повторяющиеся пары суммируются при переводе в CSR
+        graph = sparse.coo_matrix(
+            (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+            shape=(len(vocab), len(vocab)),
+        ).tocsr()
+        return vocab, graph
+
+    def rank(self, tokens: list[str]) -> dict[str, float]:
+        """
+        Оценка TextRank для каждого слова.
+        """
+        vocab, graph = self.build_graph(tokens)
+        if not vocab:
+            return {}
+        inout = np.asarray(graph.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, inout, out=np.zeros_like(inout), where=inout != 0)
+        transition = graph @ sparse.diags(inverse)
+
+        score = np.ones(len(vocab))
+        for _ in range(self.max_iterations):
+            previous = score
+            score = (1 - self.damping) + self.damping * (transition @ previous)
+            if np.abs(previous - score).sum() <= self.threshold:
+                break
+        return dict(zip(vocab, score.tolist()))
+
+    @staticmethod
+    def top_phrases(phrases: list[list[str]], scores: dict[str, float], k: int = 10) -> list[str]:
+        """
+        Лучшие k фраз по сумме оценок слов.
+
+        Однословная фраза отбрасывается, если её слово входит в более длинную фразу.
+        """
+        unique_phrases = [list(phrase) for phrase in dict.fromkeys(tuple(p) for p in phrases)]
+        in_longer = {word for phrase in unique_phrases if len(phrase) > 1 for word in phrase}
+        unique_phrases = [p for p in unique_phrases if len(p) > 1 or p[0] not in in_longer]
+
+        scored = [(' '.join(p), sum(scores.get(word, 0.0) for word in p)) for p in unique_phrases]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [phrase for phrase, _ in scored[:k]]
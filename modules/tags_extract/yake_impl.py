@@ -1,184 +1,197 @@
-import json
 import math
-import re
 import string
 from collections import defaultdict
-from pathlib import Path
+from dataclasses import dataclass, field
+from itertools import accumulate
 
 import nltk
 import numpy
-import pymorphy3
 from nltk import ngrams
 
+from modules.stopwords.main import stopword_registry
+from modules.tags_extract.morph_cache import morph_cache
+from modules.text_normalizer.main import yake_normalizer
+
+
+@dataclass
+class YakeDocument:
+    """
+    Состояние обработки одного текста. Создаётся на каждый вызов
+    generate_keywords, поэтому результаты разных книг не смешиваются.
+    """
+    text: str
+    stopwords: frozenset[str]
+    sentences: list[str] = field(default_factory=list)
+    sentence_tokens: list[list[str]] = field(default_factory=list)
+    words: defaultdict = field(default_factory=lambda: defaultdict(set))
+    contexts: defaultdict = field(default_factory=lambda: defaultdict(lambda: ([], [])))
+    features: defaultdict = field(default_factory=lambda: defaultdict(dict))
+    candidates: list[tuple[str, ...]] = field(default_factory=list)
+
 
 class Yake:
+    """
+    Извлечение ключевых фраз YAKE.
+
+    Экземпляр не хранит собственного состояния, всё состояние документа живёт
+    в YakeDocument, так что один экземпляр можно использовать из нескольких
+    потоков одновременно.
+    """
+
     def __init__(self):
-        self.words = defaultdict(set)
-        self.contexts = defaultdict(lambda: ([], []))
-        self.morph = pymorphy3.MorphAnalyzer(lang='ru')
-        self.features = defaultdict(dict)
-        self.surface_to_lexical = {}
-        self.candidates = []
-        self.sentences = []
-        self.text = ''
-        with open(Path(__file__).resolve().parent / "stopwords.json", 'r', encoding='utf-8') as file:
-            self.stopwords = set(json.loads(file.read()))
-
-    def __preprocess_text(self):
-        self.text = re.sub(r"([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", self.text, flags=re.IGNORECASE)
-        self.text = re.sub(r"([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", self.text, flags=re.IGNORECASE)
-        self.text = re.sub("\n|«|»|–|…|\d|гг\.", '', self.text)
-        self.text = re.sub("предисловие", '', self.text, flags=re.IGNORECASE)
-        self.text = re.sub(" {2,}", ' ', self.text)
-        self.text = self.text.strip()
-
-    def __generate_candidates(self, from_gr=1, n: int = 3):
-        tokens = [t for t in nltk.word_tokenize(self.text) if t not in string.punctuation]
+        self.morph = morph_cache
+
+    @staticmethod
+    def __split_to_sentences(doc: YakeDocument):
+        # word_tokenize сам делит текст на предложения, поэтому токены текста
+        # совпадают с объединением токенов его предложений
+        doc.sentences = nltk.sent_tokenize(doc.text)
+        doc.sentence_tokens = [nltk.word_tokenize(sentence) for sentence in doc.sentences]
+
+    def __generate_candidates(self, doc: YakeDocument, from_gr=1, n: int = 3):
+        tokens = [t for sentence in doc.sentence_tokens for t in sentence if t not in string.punctuation]
         cands = []
         for i in range(from_gr, n + 1):
             ngr = [ngram for ngram in set(ngrams(tokens, i))]
             cands.extend(ngr)
         for k in cands:
-            normal_form_in_stopwords = self.morph.parse(k[0])[0].normal_form.lower() in self.stopwords or \
-                                       self.morph.parse(k[-1])[0].normal_form.lower() in self.stopwords
-            initial_form_in_stopwords = k[0].lower() in self.stopwords or k[-1].lower() in self.stopwords
+            normal_form_in_stopwords = self.morph.parse(k[0]).normal_form.lower() in doc.stopwords or \
+                                       self.morph.parse(k[-1]).normal_form.lower() in doc.stopwords
+            initial_form_in_stopwords = k[0].lower() in doc.stopwords or k[-1].lower() in doc.stopwords
             if not normal_form_in_stopwords and not initial_form_in_stopwords:
-                self.candidates.append(k)
-
-    def __split_to_sentences(self):
-        self.sentences = nltk.sent_tokenize(self.text)
-
-    def __vocabulary_building(self):
-        for i, sentence in enumerate(self.sentences):
-            shift = sum([len(s) for s in self.sentences[0:i]])
-            for j, word in enumerate(nltk.word_tokenize(sentence)):
+                doc.candidates.append(k)
+
+    @staticmethod
+    def __vocabulary_building(doc: YakeDocument):
+        # shift — суммарная длина предыдущих предложений в символах
+        shifts = accumulate((len(s) for s in doc.sentences), initial=0)
+        for i, (shift, tokens) in enumerate(zip(shifts, doc.sentence_tokens)):
+            for j, word in enumerate(tokens):
                 index = word.lower()
-                self.words[index].add((shift + j, shift, i, word))
+                doc.words[index].add((shift + j, shift, i, word))
+
+    @staticmethod
+    def __feature_extraction(doc: YakeDocument):
+        words = doc.words
+        features = doc.features
 
-    def __feature_extraction(self):
         # get the Term Frequency of each word
-        TF = [len(self.words[w]) for w in self.words]
+        TF = [len(words[w]) for w in words]
 
         # get the Term Frequency of non-stop words
-        TF_nsw = [len(self.words[w]) for w in self.words if w not in self.stopwords]
+        TF_nsw = [len(words[w]) for w in words if w not in doc.stopwords]
 
         # compute statistics
         mean_TF = numpy.mean(TF_nsw)
         std_TF = numpy.std(TF_nsw)
         max_TF = max(TF)
-        for word in self.words:
+        for word in words:
 
             # Indicating whether the word is a stopword (vitordouzi change)
-            self.features[word]['isstop'] = word in self.stopwords or len(word) < 3
+            features[word]['isstop'] = word in doc.stopwords or len(word) < 3
 
             # Term Frequency
-            self.features[word]['TF'] = len(self.words[word])
+            features[word]['TF'] = len(words[word])
 
             # Uppercase/Acronym Term Frequencies
-            self.features[word]['TF_A'] = 0
-            self.features[word]['TF_U'] = 0
-            for (offset, shift, sent_id, surface_form) in self.words[word]:
+            features[word]['TF_A'] = 0
+            features[word]['TF_U'] = 0
+            for (offset, shift, sent_id, surface_form) in words[word]:
                 if surface_form.isupper() and len(word) > 1:
-                    self.features[word]['TF_A'] += 1
+                    features[word]['TF_A'] += 1
                 elif surface_form[0].isupper() and offset != shift:
-                    self.features[word]['TF_U'] += 1
+                    features[word]['TF_U'] += 1
 
             # 1. CASING feature
-            self.features[word]['CASING'] = max(self.features[word]['TF_A'],
-                                                self.features[word]['TF_U'])
-            self.features[word]['CASING'] /= 1.0 + math.log(
-                self.features[word]['TF'])
+            features[word]['CASING'] = max(features[word]['TF_A'],
+                                           features[word]['TF_U'])
+            features[word]['CASING'] /= 1.0 + math.log(
+                features[word]['TF'])
 
             # 2. POSITION feature
-            sentence_ids = list(set([t[2] for t in self.words[word]]))
-            self.features[word]['POSITION'] = math.log(
+            sentence_ids = list(set([t[2] for t in words[word]]))
+            features[word]['POSITION'] = math.log(
                 3.0 + numpy.median(sentence_ids))
-            self.features[word]['POSITION'] = math.log(
-                self.features[word]['POSITION'])
+            features[word]['POSITION'] = math.log(
+                features[word]['POSITION'])
 
             # 3. FREQUENCY feature
-            self.features[word]['FREQUENCY'] = self.features[word]['TF']
-            self.features[word]['FREQUENCY'] /= (mean_TF + std_TF)
+            features[word]['FREQUENCY'] = features[word]['TF']
+            features[word]['FREQUENCY'] /= (mean_TF + std_TF)
 
             # 4. RELATEDNESS feature
-            self.features[word]['WL'] = 0.0
-            if len(self.contexts[word][0]):
-                self.features[word]['WL'] = len(set(self.contexts[word][0]))
-                self.features[word]['WL'] /= len(self.contexts[word][0])
-            self.features[word]['PL'] = len(set(self.contexts[word][0])) / max_TF
-
-            self.features[word]['WR'] = 0.0
-            if len(self.contexts[word][1]):
-                self.features[word]['WR'] = len(set(self.contexts[word][1]))
-                self.features[word]['WR'] /= len(self.contexts[word][1])
-            self.features[word]['PR'] = len(set(self.contexts[word][1])) / max_TF
-
-            self.features[word]['RELATEDNESS'] = 1
-            self.features[word]['RELATEDNESS'] += (self.features[word]['WR'] +
-                                                   self.features[word]['WL']) * \
-                                                  (self.features[word]['TF'] / max_TF)
+            features[word]['WL'] = 0.0
+            if len(doc.contexts[word][0]):
+                features[word]['WL'] = len(set(doc.contexts[word][0]))
+                features[word]['WL'] /= len(doc.contexts[word][0])
+            features[word]['PL'] = len(set(doc.contexts[word][0])) / max_TF
+
+            features[word]['WR'] = 0.0
+            if len(doc.contexts[word][1]):
+                features[word]['WR'] = len(set(doc.contexts[word][1]))
+                features[word]['WR'] /= len(doc.contexts[word][1])
+            features[word]['PR'] = len(set(doc.contexts[word][1])) / max_TF
+
+            features[word]['RELATEDNESS'] = 1
+            features[word]['RELATEDNESS'] += (features[word]['WR'] +
+                                              features[word]['WL']) * \
+                                             (features[word]['TF'] / max_TF)
 
             # 5. DIFFERENT feature
-            self.features[word]['DIFFERENT'] = len(set(sentence_ids))
-            self.features[word]['DIFFERENT'] /= len(self.sentences)
+            features[word]['DIFFERENT'] = len(set(sentence_ids))
+            features[word]['DIFFERENT'] /= len(doc.sentences)
 
             # assemble the features to weight words
-            A = self.features[word]['CASING']
-            B = self.features[word]['POSITION']
-            C = self.features[word]['FREQUENCY']
-            D = self.features[word]['RELATEDNESS']
-            E = self.features[word]['DIFFERENT']
-            self.features[word]['weight'] = (D * B) / (A + (C / D) + (E / D))
-
-    def __contexts_building(self, window=2):
+            A = features[word]['CASING']
+            B = features[word]['POSITION']
+            C = features[word]['FREQUENCY']
+            D = features[word]['RELATEDNESS']
+            E = features[word]['DIFFERENT']
+            features[word]['weight'] = (D * B) / (A + (C / D) + (E / D))
+
+    @staticmethod
+    def __contexts_building(doc: YakeDocument, window=2):
         """Build the contexts of the words for computing the relatedness
         feature. Words that occur within a window of n words are considered as
         context words. Only words co-occurring in a block (sequence of words
         that appear in the vocabulary) are considered.
 
         Args:
-            use_stems (bool): whether to use stems instead of lowercase words
-                for weighting, defaults to False.
+            doc (YakeDocument): the document being processed.
             window (int): the size in words of the window used for computing
                 co-occurrence counts, defaults to 2.
         """
         # loop through sentences
-        for i, sentence in enumerate(self.sentences):
+        for tokens in doc.sentence_tokens:
             # lowercase the words
-            words = [w.lower() for w in nltk.word_tokenize(sentence)]
+            words = [w.lower() for w in tokens]
             # block container
             block = []
             # loop through words in sentence
-            for j, word in enumerate(words):
+            for word in words:
                 # skip and flush block if word is not in vocabulary
-                if word not in self.words:
+                if word not in doc.words:
                     block = []
                     continue
                 # add the left context
-                self.contexts[word][0].extend(
+                doc.contexts[word][0].extend(
                     [w for w in block[max(0, len(block) - window):len(block)]]
                 )
                 # add the right context
                 for w in block[max(0, len(block) - window):len(block)]:
-                    self.contexts[w][1].append(word)
+                    doc.contexts[w][1].append(word)
                 # add word to the current block
                 block.append(word)
 
-    def __count_kw(self, kw: str):
-        c = 0
-        for i in self.candidates:
-            if kw == i:
-                c += 1
-        return c
-
-    def get_n_best(self, n=10):
+    @staticmethod
+    def get_n_best(doc: YakeDocument, n=10):
         res = []
-        for c in self.candidates:
+        for c in doc.candidates:
             product = 1
             summary = 0
             count = 0
             for ic in c:
-                word_features = self.features[ic.lower()]
+                word_features = doc.features[ic.lower()]
                 product *= word_features.get("weight")
                 summary += word_features.get("weight")
                 count += 1 if not word_features.get("isstop") else 0
@@ -190,16 +203,15 @@ class Yake:
         return res[:n]
 
     def generate_keywords(self, text: str, n=5, from_grams=1, to_grams=3, stem=False):
-        self.text = text
-        self.__preprocess_text()
-        self.__split_to_sentences()
-        self.__generate_candidates(from_gr=from_grams, n=to_grams)
-        self.__vocabulary_building()
-        self.__contexts_building()
-        self.__feature_extraction()
-        candidates = self.get_n_best(n)
+        doc = YakeDocument(text=yake_normalizer.normalize(text), stopwords=stopword_registry.get("tags"))
+        self.__split_to_sentences(doc)
+        self.__generate_candidates(doc, from_gr=from_grams, n=to_grams)
+        self.__vocabulary_building(doc)
+        self.__contexts_building(doc)
+        self.__feature_extraction(doc)
+        candidates = self.get_n_best(doc, n)
         if stem:
-            return [self.morph.parse(_[0])[0].normal_form for _ in candidates]
+            return [self.morph.parse(_[0]).normal_form for _ in candidates]
         return [_[0] for _ in candidates]
 
 
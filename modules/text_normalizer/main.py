@@ -0,0 +1,156 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Одна замена цепочки нормализации с заранее скомпилированным шаблоном.
+    """
+    pattern: re.Pattern
+    repl: str
+
+    def apply(self, text: str) -> str:
+        return self.pattern.sub(self.repl, text)
+
+
+def _rule(pattern: str, repl: str, flags: int = 0) -> Rule:
+    return Rule(re.compile(pattern, flags), repl)
+
+
+class Normalizer:
+    """
+    Последовательность замен, применяемая к тексту целиком или по частям.
+
+    boundary — шаблон позиций, через которые не может пройти ни одно совпадение
+    ни на одном шаге цепочки. В потоковом режиме текст режется только по таким
+    позициям, поэтому результат совпадает с нормализацией склеенного текста.
+    """
+
+    def __init__(self, rules: Iterable[Rule], strip: bool = False, boundary: Optional[re.Pattern] = None):
+        self.rules = tuple(rules)
+        self.strip = strip
+        self.boundary = boundary
+
+    def _apply(self, text: str) -> str:
+        for rule in self.rules:
+            text = rule.apply(text)
+        return text
+
+    def normalize(self, text: str) -> str:
+        text = self._apply(text)
+        return text.strip() if self.strip else text
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Нормализует текст, поступающий частями (например, по страницам).
+        Склейка выданных частей равна normalize(''.join(chunks)).
+        """
+        if self.boundary is None:
+            raise ValueError("Для этой цепочки потоковый режим не поддерживается")
+        pending = ''
+        trailing = ''
+        started = False
+        for chunk in chunks:
+            # Позиции до старого конца буфера уже проверены
+            searched = len(pending)
+            pending += chunk
+            cut = None
+            for cut in self.boundary.finditer(pending, searched):
+                pass
+            if cut is None:
+                continue
+            head, pending = pending[:cut.start()], pending[cut.start():]
+            piece, trailing, started = self._emit(self._apply(head), trailing, started)
+            if piece:
+                yield piece
+        piece, _, _ = self._emit(self._apply(pending), trailing, started)
+        if piece:
+            yield piece
+
+    def _emit(self, text: str, trailing: str, started: bool) -> tuple[str, str, bool]:
+        # strip() для потока: пробелы в начале потока отбрасываются, а пробелы
+        # в конце части придерживаются до появления следующего непробельного текста
+        if not self.strip:
+            return text, '', True
+        if not started:
+            text = text.lstrip()
+        body = text.rstrip()
+        if not body:
+            return '', trailing + text if started else '', started
+        return trailing + body, text[len(body):], True
+
+
+# Шаблоны, начинающиеся с ([а-яё]+), дополнены (?<![а-яё]): без него поиск повторяется
+# с каждой буквы слова. Результат тот же — совпадение, начатое внутри слова, нашлось бы
+# уже с его первой буквы, а предыдущее совпадение всегда заканчивается не буквой
+HYPHENATION_RULES = (
+    _rule(r"(?<![а-яё])([а-яё]+) ([а-яё])-\n([а-яё]+)", r"\1\2\3", re.IGNORECASE),
+    _rule(r"(?<![а-яё])([а-яё]+) ([а-яё])-([а-яё]+)", r"\1\2\3", re.IGNORECASE),
+)
+
+# Точка после буквы (кроме «г», чтобы не разрезать «гг.») и перед пробелом
+SENTENCE_BOUNDARY = re.compile(r"(?<=[^\W\dгГ_]\.)(?= )")
+# Буква, за которой идёт знак препинания (не пробел и не дефис)
+PUNCTUATION_BOUNDARY = re.compile(r"(?<=[а-яА-ЯЁёa-zA-Z])(?=[^\sа-яА-ЯЁёa-zA-Z\-])")
+
+# Полная очистка текста перед извлечением ключевых слов
+keywords_normalizer = Normalizer(
+    HYPHENATION_RULES + (
+        _rule(r"(?<![а-яё])([а-яё]+)\s?-\n([а-яё]+)", r"\1\2", re.IGNORECASE),
+        _rule(r"\s?([а-яё]+[аеёиоуыэюя])\s?-\s?([бвгджзйклмнпрстфхцчшщ][а-яё]+)\s?", r" \1\2 ", re.IGNORECASE),
+        _rule(r"\s([а-яё]{2}) ([а-яё])-\s([а-яё]+) ([аеёиоуыэюя]{2})\s", r" \1\2\3\4 ", re.IGNORECASE),
+        # Окончания склеиваются отдельными проходами: одно регулярное выражение
+        # с альтернативой даёт другой результат на цепочках вида «слово ая ые »
+        _rule(r"(?<![а-яё])([а-яё]+) ые ", r"\1ые ", re.IGNORECASE),
+        _rule(r"(?<![а-яё])([а-яё]+) ая ", r"\1ая ", re.IGNORECASE),
+        _rule(r"(?<![а-яё])([а-яё]+) ях ", r"\1ях ", re.IGNORECASE),
+        _rule(r" ([мргнтчфждлхз]) ([а-яё]+)", r"\1\2 ", re.IGNORECASE),
+        _rule(r" п ри-", r"при", re.IGNORECASE),
+        _rule(r"\n|«|»|–|…|\d|гг\.", ''),
+        _rule(r"предисловие", '', re.IGNORECASE),
+        _rule(r"количе ство", 'количество', re.IGNORECASE),
+        _rule(r" {2,}|\.{2,}", ' '),
+    ),
+    strip=True,
+    boundary=SENTENCE_BOUNDARY,
+)
+
+# Очистка для YAKE
+yake_normalizer = Normalizer(
+    HYPHENATION_RULES + (
+        _rule(r"\n|«|»|–|…|\d|гг\.", ''),
+        _rule(r"предисловие", '', re.IGNORECASE),
+        _rule(r" {2,}", ' '),
+    ),
+    strip=True,
+    boundary=SENTENCE_BOUNDARY,
+)
+
+# Только буквы: каждый прочий символ заменяется пробелом (TextRank)
+letters_normalizer = Normalizer(
+    HYPHENATION_RULES + (
+        _rule(r"[^а-яА-ЯЁёa-zA-Z]", ' '),
+    ),
+    boundary=PUNCTUATION_BOUNDARY,
+)
+
+# Только буквы, серии прочих символов сжимаются в один пробел (RAKE).
+# Замена посимвольно и последующее сжатие пробелов дают ровно то же, что один проход по сериям
+rake_normalizer = Normalizer(
+    HYPHENATION_RULES + (
+        _rule(r"[^а-яА-ЯЁёa-zA-Z]+", ' '),
+    ),
+    boundary=PUNCTUATION_BOUNDARY,
+)
+
+RUSSIAN_WORD_PATTERN = re.compile(r'[А-ЯЁа-яё]+')
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def russian_words(chunks: Iterable[str]) -> str:
+    """
+    Русские слова из частей текста через пробел; равно поиску по ' '.join(chunks).
+    """
+    return ' '.join(word for chunk in chunks for word in RUSSIAN_WORD_PATTERN.findall(chunk))
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from configs.Database import get_async_session, AnalysisCache
+
+
+class AnalysisCacheRepository:
+    """
+    Репозиторий кэша результатов анализа, адресуемого хэшем содержимого книги.
+    """
+    db: AsyncSession
+
+    def __init__(self, db: AsyncSession = Depends(get_async_session)) -> None:
+        self.db = db
+
+    async def get_tags(self, content_sha256: str, analyzer_version: str, stopwords_version: str) -> Optional[list[str]]:
+        """
+        Возвращает сохранённые теги или None, если результата для этих версий нет.
+        """
+        result = await self.db.execute(
+            select(AnalysisCache.tags).filter(
+                AnalysisCache.content_sha256 == content_sha256,
+                AnalysisCache.analyzer_version == analyzer_version,
+                AnalysisCache.stopwords_version == stopwords_version,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def put_tags(self, content_sha256: str, analyzer_version: str, stopwords_version: str,
+                       tags: list[str]) -> None:
+        """
+        Сохраняет теги; при параллельной записи того же ключа побеждает первая.
+        """
+        await self.db.execute(
+            insert(AnalysisCache)
+            .values(
+                content_sha256=content_sha256,
+                analyzer_version=analyzer_version,
+                stopwords_version=stopwords_version,
+                tags=tags,
+            )
+            .on_conflict_do_nothing(constraint="uq_analysis_cache_key")
+        )
+        await self.db.commit()
@@ -0,0 +1,126 @@
+import datetime
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import func, or_, and_, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from configs.Database import get_async_session, AnalysisJob
+
+# Ключ advisory-блокировки, сериализующей выбор задач между воркерами uvicorn
+CLAIM_LOCK_KEY = 7310251
+
+
+class AnalysisJobRepository:
+    """
+    Репозиторий для работы с таблицей AnalysisJob.
+    """
+    db: AsyncSession
+
+    def __init__(self, db: AsyncSession = Depends(get_async_session)) -> None:
+        self.db = db
+
+    async def create(self, job: AnalysisJob) -> AnalysisJob:
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_by_id(self, job_id: int) -> Optional[AnalysisJob]:
+        """
+        Возвращает задачу вместе с книгой, созданной по её результату.
+        """
+        result = await self.db.execute(
+            select(AnalysisJob)
+            .options(selectinload(AnalysisJob.book))
+            .filter(AnalysisJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_all_user_jobs(self, user_id) -> list[AnalysisJob]:
+        result = await self.db.execute(
+            select(AnalysisJob)
+            .options(selectinload(AnalysisJob.book))
+            .where(AnalysisJob.user_id == user_id)
+            .order_by(AnalysisJob.id.desc())
+        )
+        return result.scalars().all()
+
+    async def claim_next(self, max_per_user: int, stale_after: float) -> Optional[AnalysisJob]:
+        """
+        Забирает следующую задачу: сначала по приоритету, затем по времени постановки.
+
+        Пропускает пользователей, у которых уже max_per_user задач в работе.
+        Задачи в статусе running без отметки дольше stale_after секунд считаются
+        брошенными (например, после перезапуска) и выдаются повторно.
+        """
+        now = datetime.datetime.utcnow()
+        stale_before = now - datetime.timedelta(seconds=stale_after)
+        is_active = and_(AnalysisJob.status == 'running', AnalysisJob.heartbeat_at >= stale_before)
+        is_available = or_(
+            AnalysisJob.status == 'queued',
+            and_(AnalysisJob.status == 'running', AnalysisJob.heartbeat_at < stale_before),
+        )
+
+        await self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+        busy_users = (
+            select(AnalysisJob.user_id)
+            .where(is_active)
+            .group_by(AnalysisJob.user_id)
+            .having(func.count(AnalysisJob.id) >= max_per_user)
+        )
+        result = await self.db.execute(
+            select(AnalysisJob)
+            .where(is_available, AnalysisJob.user_id.not_in(busy_users))
+            .order_by(AnalysisJob.priority.desc(), AnalysisJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            await self.db.commit()
+            return None
+
+        job.status = 'running'
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        await self.db.commit()
+        return job
+
+    async def update_progress(self, job: AnalysisJob, stage: str, progress: float) -> None:
+        job.stage = stage
+        job.progress = progress
+        job.heartbeat_at = datetime.datetime.utcnow()
+        await self.db.commit()
+
+    async def touch(self, job_id: int) -> None:
+        """
+        Обновляет heartbeat_at выполняющейся задачи.
+        """
+        await self.db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, AnalysisJob.status == 'running')
+            .values(heartbeat_at=datetime.datetime.utcnow())
+        )
+        await self.db.commit()
+
+    async def finish(self, job: AnalysisJob, book_id: int) -> None:
+        job.status = 'done'
+        job.stage = 'done'
+        job.progress = 1.0
+        job.book_id = book_id
+        job.finished_at = datetime.datetime.utcnow()
+        await self.db.commit()
+
+    async def fail(self, job: AnalysisJob, error: str, retry: bool) -> None:
+        """
+        Помечает задачу упавшей или возвращает её в очередь для повторной попытки.
+        """
+        job.status = 'queued' if retry else 'failed'
+        job.error = error
+        if not retry:
+            job.finished_at = datetime.datetime.utcnow()
+        await self.db.commit()
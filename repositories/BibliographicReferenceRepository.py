@@ -1,9 +1,25 @@
+import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import Depends
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, selectinload
 
 from configs.Database import get_async_session, BibliographicReference, Book
+from modules.pagination.main import Page, PageRequest, apply_keyset, make_page
+from repositories.RatingStatsRepository import RatingStatsRepository
+
+# Поля, доступные в проекции fields=; поля книги — с префиксом book.
+PROJECTION_FIELDS = {
+    **{name: getattr(BibliographicReference, name) for name in (
+        "id", "title", "author", "publisher", "isbn", "year", "city", "pages", "average_rating", "rating_count",
+    )},
+    **{f"book.{name}": getattr(Book, name) for name in (
+        "id", "bookTitle", "tags", "is_public", "time", "section_id",
+    )},
+}
 
 
 class BibliographicReferenceRepository:
@@ -11,9 +27,12 @@ class BibliographicReferenceRepository:
     Репозиторий для работы с таблицей BibliographicReference.
     """
     db: AsyncSession
+    rating_stats: RatingStatsRepository
 
-    def __init__(self, db: AsyncSession = Depends(get_async_session)):
+    def __init__(self, db: AsyncSession = Depends(get_async_session),
+                 rating_stats: RatingStatsRepository = Depends()):
         self.db = db
+        self.rating_stats = rating_stats
 
     async def create_bibliographic_reference(self, book_id: int, title: str, author: str, publisher: str,isbn: str, year: int, city:str, pages:int) -> BibliographicReference:
         """
@@ -34,12 +53,11 @@ class BibliographicReferenceRepository:
         await self.db.refresh(bibliographic)
         return bibliographic
 
-    async def get_all(self) -> list[BibliographicReference]:
+    async def get_all(self, page: PageRequest) -> Page:
         """
-        Возвращает все библиографические справки.
+        Возвращает страницу библиографических справок.
         """
-        result = await self.db.execute(select(BibliographicReference))
-        return result.scalars().all()
+        return await self._get_page(page)
 
 
     async def get_by_id(self, bibliographic_reference_id: int) -> BibliographicReference:
@@ -68,6 +86,8 @@ class BibliographicReferenceRepository:
         if bibliographic:
             bibliographic.average_rating = average_rating
             bibliographic.rating_count = rating_count
+            bibliographic.rating_sum = average_rating * rating_count
+            await self.rating_stats.refresh_max_reference_rating_count()
             await self.db.commit()
 
     async def delete_by_id(self, bibliographic_reference_id: int) -> None:
@@ -77,6 +97,8 @@ class BibliographicReferenceRepository:
         bibliographic = await self.get_by_id(bibliographic_reference_id)
         if bibliographic:
             await self.db.delete(bibliographic)
+            await self.db.flush()
+            await self.rating_stats.refresh_max_reference_rating_count()
             await self.db.commit()
 
     async def get_book_by_bibliographic_reference_id(self, bibliographic_reference_id: int) -> Book:
@@ -97,34 +119,86 @@ class BibliographicReferenceRepository:
         )
         return result.all()
 
-    async def get_all_with_tags(self):
+    async def get_candidates_with_books(self, tags: list[str], exclude_id: Optional[int] = None):
         """
-        Возвращает все библиографические справки и связанные с ними теги.
+        Библиографические справки и книги, у которых есть хотя бы один общий тег с tags.
+        Пересечение массивов (&&) обслуживается GIN-индексом по Book.tags.
         """
-        result = await self.db.execute(
-            select(BibliographicReference).options(selectinload(BibliographicReference.book))
+        query = (
+            select(BibliographicReference, Book)
+            .join(Book, BibliographicReference.book_id == Book.id)
+            .where(Book.tags.overlap(tags))
         )
-        return result.scalars().all()
+        if exclude_id is not None:
+            query = query.where(BibliographicReference.id != exclude_id)
+        result = await self.db.execute(query)
+        return result.all()
 
-    async def get_all_with_tags_by_section(self, section_id: int):
+    async def get_max_rating_count(self) -> int:
         """
-        Возвращает все библиографические справки, у которых книга привязана к определённому разделу.
+        Наибольшее количество оценок среди всех справок, из накопленной статистики.
         """
-        result = await self.db.execute(
-            select(BibliographicReference)
-            .join(BibliographicReference.book)  # JOIN book
-            .options(selectinload(BibliographicReference.book))  # для сериализации
-            .where(Book.section_id == section_id)  # фильтрация по разделу
-        )
-        return result.scalars().all()
+        stats = await self.rating_stats.get_global()
+        return stats["max_reference_rating_count"]
 
-    async def get_all_with_sections(self):
+    async def get_all_with_tags(self, page: PageRequest) -> Page:
         """
-        Возвращает все библиографические справки с их секциями.
+        Возвращает страницу библиографических справок вместе с книгами и их тегами.
         """
-        result = await self.db.execute(
+        return await self._get_page(page, with_book=True)
+
+    async def get_all_with_tags_by_section(self, section_id: int, page: PageRequest) -> Page:
+        """
+        Возвращает страницу справок, у которых книга привязана к определённому разделу.
+        """
+        return await self._get_page(page, with_book=True, section_id=section_id)
+
+    async def get_all_with_sections(self, page: PageRequest) -> Page:
+        """
+        Возвращает страницу библиографических справок с книгами и их разделами.
+        """
+        return await self._get_page(page, with_book=True)
+
+    async def stream_catalog(self, section_id: Optional[int] = None,
+                             updated_since: Optional[datetime.datetime] = None,
+                             batch_size: int = 500) -> AsyncIterator[BibliographicReference]:
+        """
+        Справки с книгами по возрастанию id, читаемые серверным курсором пачками по batch_size.
+        Книга подгружается тем же запросом (contains_eager), без отдельных SELECT.
+        """
+        query = (
             select(BibliographicReference)
-            .join(BibliographicReference.book)  # JOIN book
-            .options(selectinload(BibliographicReference.book))  # для сериализации
+            .join(BibliographicReference.book)
+            .options(contains_eager(BibliographicReference.book))
+            .order_by(BibliographicReference.id)
+            .execution_options(yield_per=batch_size)
         )
-        return result.scalars().all()
+        if section_id is not None:
+            query = query.where(Book.section_id == section_id)
+        if updated_since is not None:
+            query = query.where(BibliographicReference.updated_at >= updated_since)
+        result = await self.db.stream_scalars(query)
+        async for reference in result:
+            yield reference
+
+    async def _get_page(self, page: PageRequest, with_book: bool = False, section_id: Optional[int] = None) -> Page:
+        """
+        Страница справок по возрастанию id. С fields выбираются только нужные столбцы,
+        без загрузки объектов; книга присоединяется, только если нужны её поля или раздел.
+        """
+        if page.fields is not None:
+            query = select(*(PROJECTION_FIELDS[name].label(name) for name in page.fields))
+            if section_id is not None or any(name.startswith("book.") for name in page.fields):
+                query = query.select_from(BibliographicReference).join(Book, BibliographicReference.book_id == Book.id)
+        else:
+            query = select(BibliographicReference)
+            if with_book:
+                query = query.options(selectinload(BibliographicReference.book))  # для сериализации
+            if section_id is not None:
+                query = query.join(BibliographicReference.book)
+        if section_id is not None:
+            query = query.where(Book.section_id == section_id)  # фильтрация по разделу
+
+        result = await self.db.execute(apply_keyset(query, BibliographicReference.id, page))
+        rows = result.all() if page.fields is not None else result.scalars().all()
+        return make_page(rows, page)
@@ -2,18 +2,27 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func
+from typing import Optional
 from uuid import UUID
 
 from sqlalchemy.orm import selectinload
 
 from configs.Database import get_async_session, BibliographicReference, BookFeedback, Book
+from repositories.RatingStatsRepository import RatingStatsRepository
+from repositories.UserRepository import UserRepository
 
 
 class FeedbackRepository:
     db: AsyncSession
+    rating_stats: RatingStatsRepository
+    user_repository: UserRepository
 
-    def __init__(self, db: AsyncSession = Depends(get_async_session)) -> None:
+    def __init__(self, db: AsyncSession = Depends(get_async_session),
+                 rating_stats: RatingStatsRepository = Depends(),
+                 user_repository: UserRepository = Depends()) -> None:
         self.db = db
+        self.rating_stats = rating_stats
+        self.user_repository = user_repository
 
     async def get_by_id(self, feedback_id: int) -> BookFeedback:
         """
@@ -35,7 +44,7 @@ class FeedbackRepository:
 
     async def add_feedback(self, user_id: UUID, bibliographic_reference_id: int, rating: float, comment: str = None) -> BookFeedback:
         """
-        Добавляет новый отзыв.
+        Добавляет новый отзыв и в той же транзакции обновляет статистику оценок.
         """
         feedback = BookFeedback(
             user_id=user_id,
@@ -44,79 +53,61 @@ class FeedbackRepository:
             comment=comment
         )
         self.db.add(feedback)
+        await self.db.flush()
+        await self.rating_stats.apply_rating(bibliographic_reference_id, rating)
         await self.db.commit()
         await self.db.refresh(feedback)
         return feedback
 
-    async def update_bibliographic_rating(self, bibliographic_reference_id: int) -> dict:
+    async def get_bibliographic_rating(self, bibliographic_reference_id: int) -> dict:
         """
-        Пересчет среднего рейтинга и количества оценок для библиографической справки.
+        Средний рейтинг и количество оценок справки из накопленных счётчиков.
         """
+        # Выбираются столбцы, а не объект: объект справки в сессии мог остаться с прежними значениями
         result = await self.db.execute(
-            select(
-                func.avg(BookFeedback.rating).label("average"),
-                func.count(BookFeedback.id).label("count")
-            ).filter(BookFeedback.bibliographic_reference_id == bibliographic_reference_id)
+            select(BibliographicReference.average_rating, BibliographicReference.rating_count)
+            .where(BibliographicReference.id == bibliographic_reference_id)
         )
-        avg_rating, count = result.one()
-
-        bibliographic = await self.db.execute(
-            select(BibliographicReference).filter(BibliographicReference.id == bibliographic_reference_id)
-        )
-        bibliographic = bibliographic.scalar_one_or_none()
-
-        if bibliographic:
-            bibliographic.average_rating = avg_rating or 0.0
-            bibliographic.rating_count = count
-            await self.db.commit()
-
-        return {"average_rating": avg_rating or 0.0, "rating_count": count}
-
+        row = result.one_or_none()
+        if row is None:
+            return {"average_rating": 0.0, "rating_count": 0}
+        return {"average_rating": row.average_rating or 0.0, "rating_count": row.rating_count or 0}
 
     async def calculate_global_average_and_k(self):
         """
-        Вычисляет средний глобальный рейтинг и параметр сглаживания k.
+        Возвращает средний глобальный рейтинг и параметр сглаживания k из накопленной статистики.
         """
-        # Вычисляем средний глобальный рейтинг
-        global_avg_rating_query = await self.db.execute(
-            select(func.avg(BookFeedback.rating))
-        )
-        global_avg_rating = global_avg_rating_query.scalar() or 0.0
-
-        # Вычисляем параметр сглаживания k
-        max_rating_count_query = await self.db.execute(
-            select(func.max(BibliographicReference.rating_count))
-        )
-        max_rating_count = max_rating_count_query.scalar() or 0
+        stats = await self.rating_stats.get_global()
+        max_rating_count = stats["max_reference_rating_count"]
 
         # Если в базе данных нет оценок, задаем k = 0
         k = max_rating_count / 10 if max_rating_count > 0 else 0
 
-        return global_avg_rating, k
+        return stats["average_rating"], k
 
-    async def get_feedbacks_by_book_id(self, book_id: int):
+    async def get_feedbacks_by_book_id(self, book_id: int, limit: Optional[int] = None, offset: int = 0):
         """
-        Возвращает все отзывы на книгу через библиографическую справку.
+        Возвращает отзывы на книгу через библиографическую справку.
+
+        Рейтинги авторов отзывов страницы берутся одним сгруппированным запросом,
+        так что страница стоит два запроса независимо от числа отзывов.
         """
-        # Получаем библиографическую справку по book_id
-        result = await self.db.execute(
+        query = (
             select(BookFeedback)
             .join(BibliographicReference)
             .options(selectinload(BookFeedback.user))
             .where(BibliographicReference.book_id == book_id)
+            .order_by(BookFeedback.id)
+            .offset(offset)
         )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
         feedbacks = result.scalars().all()
 
         # теперь добавим каждому пользователю поле `rating`
+        ratings = await self.user_repository.get_user_ratings(feedback.user.id for feedback in feedbacks)
         for feedback in feedbacks:
-            user_id = feedback.user.id
-            rating_result = await self.db.execute(
-                select(func.avg(BookFeedback.rating))
-                .join(BibliographicReference, BookFeedback.bibliographic_reference_id == BibliographicReference.id)
-                .join(Book, BibliographicReference.book_id == Book.id)
-                .where(Book.user_id == user_id)
-            )
-            avg_rating = rating_result.scalar()
-            feedback.user.rating = round(avg_rating, 2) if avg_rating else 0.0
-
-        return feedbacks
\ No newline at end of file
+            feedback.user.rating = ratings[feedback.user.id]
+
+        return feedbacks
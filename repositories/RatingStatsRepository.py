@@ -0,0 +1,130 @@
+from fastapi import Depends
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from configs.Database import get_async_session, BibliographicReference, BookFeedback, RatingStats
+
+# Глобальные счётчики разбиты на строки id = bibliographic_reference_id % RATING_STATS_SHARDS
+# и суммируются при чтении. Строки с другими id (например, id = 1 из миграции) тоже учитываются,
+# поэтому число строк можно менять без пересчёта
+RATING_STATS_SHARDS = 16
+
+
+class RatingStatsRepository:
+    """
+    Накопительная статистика оценок: суммы и количества по справкам и по всему каталогу.
+
+    Методы изменения не делают commit — они выполняются в транзакции вызывающего,
+    вместе с самим отзывом. Upsert строки глобальных счётчиков держит её блокировку
+    до commit, поэтому счётчики разбиты на RATING_STATS_SHARDS строк: одновременные
+    отзывы на разные справки обычно попадают в разные строки и не ждут друг друга.
+    """
+    db: AsyncSession
+
+    def __init__(self, db: AsyncSession = Depends(get_async_session)) -> None:
+        self.db = db
+
+    async def apply_rating(self, bibliographic_reference_id: int, rating: float) -> dict:
+        """
+        Учитывает новую оценку справки и возвращает её обновлённые средний рейтинг и количество оценок.
+        """
+        # В SET справа стоят значения до обновления, поэтому строка меняется одним атомарным UPDATE
+        result = await self.db.execute(
+            update(BibliographicReference)
+            .where(BibliographicReference.id == bibliographic_reference_id)
+            .values(
+                rating_sum=BibliographicReference.rating_sum + rating,
+                rating_count=BibliographicReference.rating_count + 1,
+                average_rating=(BibliographicReference.rating_sum + rating) / (BibliographicReference.rating_count + 1),
+            )
+            .returning(BibliographicReference.average_rating, BibliographicReference.rating_count)
+            .execution_options(synchronize_session=False)
+        )
+        average_rating, rating_count = result.one()
+
+        statement = insert(RatingStats).values(
+            id=bibliographic_reference_id % RATING_STATS_SHARDS,
+            rating_sum=rating, rating_count=1, max_reference_rating_count=rating_count,
+        )
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[RatingStats.id],
+                set_={
+                    "rating_sum": RatingStats.rating_sum + statement.excluded.rating_sum,
+                    "rating_count": RatingStats.rating_count + 1,
+                    "max_reference_rating_count": func.greatest(
+                        RatingStats.max_reference_rating_count, statement.excluded.max_reference_rating_count
+                    ),
+                },
+            )
+        )
+        return {"average_rating": average_rating, "rating_count": rating_count}
+
+    async def get_global(self) -> dict:
+        """
+        Глобальные средний рейтинг, количество оценок и наибольшее количество оценок у одной справки.
+        """
+        result = await self.db.execute(
+            select(
+                func.coalesce(func.sum(RatingStats.rating_sum), 0.0),
+                func.coalesce(func.sum(RatingStats.rating_count), 0),
+                func.coalesce(func.max(RatingStats.max_reference_rating_count), 0),
+            )
+        )
+        rating_sum, rating_count, max_reference_rating_count = result.one()
+        return {
+            "average_rating": rating_sum / rating_count if rating_count else 0.0,
+            "rating_count": rating_count,
+            "max_reference_rating_count": max_reference_rating_count,
+        }
+
+    async def refresh_max_reference_rating_count(self) -> None:
+        """
+        Пересчитывает максимум количества оценок. Нужен, когда счётчик справки
+        уменьшается (удаление справки, ручная правка рейтинга): такие изменения редки.
+        """
+        result = await self.db.execute(select(func.coalesce(func.max(BibliographicReference.rating_count), 0)))
+        max_count = result.scalar()
+        # Максимум при чтении берётся по всем строкам, поэтому он переписывается в каждой
+        updated = await self.db.execute(update(RatingStats).values(max_reference_rating_count=max_count))
+        if not updated.rowcount:
+            await self.db.execute(insert(RatingStats).values(
+                id=0, rating_sum=0.0, rating_count=0, max_reference_rating_count=max_count
+            ))
+
+    async def rebuild(self) -> None:
+        """
+        Полный пересчёт всей статистики по таблице отзывов.
+        """
+        def per_reference(aggregate):
+            return (
+                select(aggregate)
+                .where(BookFeedback.bibliographic_reference_id == BibliographicReference.id)
+                .scalar_subquery()
+            )
+
+        await self.db.execute(
+            update(BibliographicReference).values(
+                rating_sum=per_reference(func.coalesce(func.sum(BookFeedback.rating), 0.0)),
+                rating_count=per_reference(func.count(BookFeedback.id)),
+                average_rating=per_reference(func.coalesce(func.avg(BookFeedback.rating), 0.0)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        shard = BookFeedback.bibliographic_reference_id % RATING_STATS_SHARDS
+        totals = await self.db.execute(
+            select(shard, func.sum(BookFeedback.rating), func.count(BookFeedback.id)).group_by(shard)
+        )
+        max_count = await self.db.execute(select(func.coalesce(func.max(BibliographicReference.rating_count), 0)))
+        max_count = max_count.scalar()
+        await self.db.execute(delete(RatingStats))
+        # Строка 0 есть всегда, чтобы максимум сохранился и без отзывов
+        rows = {0: (0.0, 0)}
+        rows.update({shard_id: (rating_sum, rating_count) for shard_id, rating_sum, rating_count in totals})
+        await self.db.execute(insert(RatingStats).values([
+            {"id": shard_id, "rating_sum": rating_sum, "rating_count": rating_count,
+             "max_reference_rating_count": max_count}
+            for shard_id, (rating_sum, rating_count) in rows.items()
+        ]))
@@ -3,6 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 from configs.Database import get_async_session, Book
+from modules.pagination.main import Page, PageRequest, apply_keyset, make_page
+
+# Поля, доступные в проекции fields=
+PROJECTION_FIELDS = {
+    name: getattr(Book, name) for name in ("id", "bookTitle", "tags", "time", "is_public", "section_id")
+}
 
 
 class RequestRepository:
@@ -18,11 +24,29 @@ class RequestRepository:
         await self.db.commit()
         return request
 
-    async def get_all_user_books(self, user_id) -> list[Book]:
-        result = await self.db.execute(
-            select(Book).where(Book.user_id == user_id)
-        )
-        return result.scalars().all()
+    async def create_many(self, requests: list[Book]) -> list[Book]:
+        """
+        Сохраняет несколько книг одной транзакцией; при ошибке транзакция откатывается.
+        """
+        self.db.add_all(requests)
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return requests
+
+    async def get_all_user_books(self, user_id, page: PageRequest) -> Page:
+        """
+        Страница книг пользователя по возрастанию id; с fields — только выбранные столбцы.
+        """
+        if page.fields is not None:
+            query = select(*(PROJECTION_FIELDS[name].label(name) for name in page.fields))
+        else:
+            query = select(Book)
+        result = await self.db.execute(apply_keyset(query.where(Book.user_id == user_id), Book.id, page))
+        rows = result.all() if page.fields is not None else result.scalars().all()
+        return make_page(rows, page)
 
     async def get_by_id(self, request_id: int) -> Book:
         result = await self.db.execute(select(Book).filter(Book.id == request_id))
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from fastapi import Depends
 from sqlalchemy import select, func
 from sqlalchemy.orm import Session
@@ -22,11 +24,28 @@ class UserRepository:
         Возвращает рейтинг пользователя как среднюю оценку всех его публикаций.
         Если публикаций или оценок нет — возвращает 0.0.
         """
+        ratings = await self.get_user_ratings([user_id])
+        return ratings.get(user_id, 0.0)
+
+    async def get_user_ratings(self, user_ids: Iterable) -> dict:
+        """
+        Рейтинги нескольких пользователей одним сгруппированным запросом.
+        Пользователи без оценённых публикаций получают 0.0.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
         result = await self.db.execute(
-            select(func.avg(BookFeedback.rating))
+            select(Book.user_id, func.avg(BookFeedback.rating))
             .join(BibliographicReference, BookFeedback.bibliographic_reference_id == BibliographicReference.id)
             .join(Book, BibliographicReference.book_id == Book.id)
-            .where(Book.user_id == user_id)
+            .where(Book.user_id.in_(user_ids))
+            .group_by(Book.user_id)
         )
-        average = result.scalar()
-        return round(average, 2) if average is not None else 0.0
\ No newline at end of file
+        # Ключи сравниваются строками: драйвер может вернуть id как UUID, даже если столбец объявлен строкой
+        averages = {str(user_id): average for user_id, average in result.all()}
+        ratings = {}
+        for user_id in user_ids:
+            average = averages.get(str(user_id))
+            ratings[user_id] = round(average, 2) if average is not None else 0.0
+        return ratings
\ No newline at end of file
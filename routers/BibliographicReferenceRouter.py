@@ -1,7 +1,16 @@
+import csv
+import datetime
+import io
+import json
+from typing import Literal, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from starlette.responses import StreamingResponse
 
+from modules.pagination.main import InvalidPageRequest, page_request, page_response
+from repositories.BibliographicReferenceRepository import PROJECTION_FIELDS
 from schemas.BibliographicReferenceSchema import BibliographicReferenceSchema
-from services.BibliographicReferenceService import BibliographicReferenceService
+from services.BibliographicReferenceService import EXPORT_FIELDS, BibliographicReferenceService
 from services.RecommendationService import RecommendationService
 
 BibliographicRouter = APIRouter(prefix="/v1/bibliographic", tags=["bibliographic"])
@@ -54,11 +63,19 @@ async def create_bibliographic_reference(
     status_code=status.HTTP_201_CREATED,
 )
 async def get_all_references(
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
         service: BibliographicReferenceService = Depends(),
 ):
+    """
+    Страница справок; курсор следующей страницы — в заголовке X-Next-Cursor.
+    """
     try:
-        result = await service.get_all_references()
-        return result
+        page = await service.get_all_references(page_request(cursor, limit, fields, PROJECTION_FIELDS))
+        return page_response(page)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
@@ -69,11 +86,16 @@ async def get_all_references(
     response_model=list[BibliographicReferenceSchema]
 )
 async def get_all_references(
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
         service: BibliographicReferenceService = Depends(),
 ):
     try:
-        result = await service.get_all_references_with_tags()
-        return result
+        page = await service.get_all_references_with_tags(page_request(cursor, limit, fields, PROJECTION_FIELDS))
+        return page_response(page, BibliographicReferenceSchema)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
@@ -81,21 +103,69 @@ async def get_all_references(
 @BibliographicRouter.get("/by-section/{section_id}", response_model=list[BibliographicReferenceSchema])
 async def get_references_by_section(
         section_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
         service: BibliographicReferenceService = Depends()
 ):
     try:
-        return await service.get_references_by_section(section_id)
+        page = await service.get_references_by_section(
+            section_id, page_request(cursor, limit, fields, PROJECTION_FIELDS)
+        )
+        return page_response(page, BibliographicReferenceSchema)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @BibliographicRouter.get("/with-sections", response_model=list[BibliographicReferenceSchema])
 async def get_all_references_with_sections(
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
         service: BibliographicReferenceService = Depends()
 ):
     try:
-        return await service.get_all_references_with_sections()
+        page = await service.get_all_references_with_sections(page_request(cursor, limit, fields, PROJECTION_FIELDS))
+        return page_response(page, BibliographicReferenceSchema)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@BibliographicRouter.get("/export")
+async def export_catalog(
+        format: Literal["ndjson", "csv"] = "ndjson",
+        section_id: Optional[int] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        service: BibliographicReferenceService = Depends()
+):
+    """
+    Потоковая выгрузка каталога в NDJSON или CSV; строки читаются из БД серверным курсором
+    и отправляются клиенту по мере чтения.
+    """
+    rows = service.export_catalog(section_id, updated_since)
+
+    if format == "csv":
+        async def stream():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            async for row in rows:
+                writer.writerow(
+                    "; ".join(value) if isinstance(value, list) else value
+                    for value in (row[name] for name in EXPORT_FIELDS)
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        return StreamingResponse(stream(), media_type="text/csv; charset=utf-8",
+                                 headers={"Content-Disposition": 'attachment; filename="catalog.csv"'})
+
+    async def stream():
+        async for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
 
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, status, UploadFile, File, Form, HTTPException
+from typing import Optional
 from uuid import UUID
 
 from configs.Database import User
+from modules.pagination.main import page_request, page_response
+from repositories.RequestRepository import PROJECTION_FIELDS
 from services.FeedbackService import FeedbackService
 from services.BookService import BookService
 from services.UserService import current_active_user
@@ -13,12 +16,18 @@ DocumentRouter = APIRouter(prefix="/v1/documents", tags=["documents"])
     status_code=status.HTTP_201_CREATED,
 )
 async def get_all_user_books(
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[str] = None,
         manager: BookService = Depends(),
         user: User = Depends(current_active_user)
 ):
+    """
+    Страница книг пользователя; курсор следующей страницы — в заголовке X-Next-Cursor.
+    """
     try:
-        result = await manager.get_all_user_books(user.id)
-        return result
+        page = await manager.get_all_user_books(user.id, page_request(cursor, limit, fields, PROJECTION_FIELDS))
+        return page_response(page)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
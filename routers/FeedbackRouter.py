@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, status, UploadFile, File, Form, HTTPException, Query
+from typing import Optional
 from uuid import UUID
 
 from configs.Database import User
@@ -44,9 +45,10 @@ async def get_by_bibliographic_reference_id(
 
 
 @FeedbackRouter.get("/by-book/{book_id}", response_model=list[BookFeedbackSchema])
-async def get_feedback_for_book(book_id: int, service: FeedbackService = Depends()):
+async def get_feedback_for_book(book_id: int, limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0),
+                                service: FeedbackService = Depends()):
     try:
-        return await service.get_feedbacks_for_book(book_id)
+        return await service.get_feedbacks_for_book(book_id, limit, offset)
     except HTTPException as e:
         raise e
     except Exception:
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, status
+
+from modules.analysis_executor.main import analysis_executor
+from modules.db_metrics.main import db_metrics
+from modules.mystem_pool.main import mystem_pool
+from modules.recommendation_cache.main import recommendation_cache
+from modules.tags_extract.morph_cache import merge_stats
+from services.BookService import tags_cache
+
+MetricsRouter = APIRouter(prefix="/v1/metrics", tags=["metrics"])
+
+
+@MetricsRouter.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+)
+async def get_metrics():
+    """
+    Метрики загрузки внутренних пулов и кэшей.
+    """
+    return {
+        "mystem_pool": mystem_pool.metrics(),
+        "analysis_cache": tags_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "db_pool": db_metrics.stats(),
+        # Кэш разборов живёт в процессах анализа и обновляется после каждой их задачи
+        "morph_cache": merge_stats(analysis_executor.worker_stats("morph_cache")),
+    }
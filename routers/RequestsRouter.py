@@ -1,14 +1,31 @@
-from typing import List, Annotated
+import json
+from typing import List, Annotated, Optional
 
-from fastapi import APIRouter, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, status, UploadFile, File, Form, HTTPException, Request
+from starlette.responses import StreamingResponse
 
 from configs.Database import User
+from modules.analysis_executor.main import AnalysisTimeout, AnalysisCancelled
+from modules.book_upload.main import InvalidUpload, UploadTooLarge
+from modules.mystem_pool.main import MystemPoolOverloaded
+from schemas.AnalysisJobSchema import AnalysisJobSchema
+from services.AnalysisJobService import AnalysisJobService
+from services.BatchAnalysisService import BatchAnalysisService
 from services.BookService import BookService
 from services.UserService import current_active_user
 
 RequestsRouter = APIRouter(prefix="/v1/analyze", tags=["requests"])
 
 
+def upload_form_schema(**fields: dict) -> dict:
+    """
+    Описание multipart-тела для OpenAPI у маршрутов, читающих форму потоком через stream_upload.
+    """
+    properties = {"file": {"type": "string", "format": "binary"}, **fields}
+    schema = {"type": "object", "required": ["file"], "properties": properties}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": schema}}}}
+
+
 @RequestsRouter.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -28,15 +45,110 @@ async def create(
 @RequestsRouter.post(
     "/mystem",
     status_code=status.HTTP_201_CREATED,
+    openapi_extra=upload_form_schema(),
 )
 async def create(
-        file: UploadFile = File(...),
+        request: Request,
         user: User = Depends(current_active_user),
         requests_service: BookService = Depends(),
 ):
     try:
-        res = await requests_service.analyze(file, user)
+        res = await requests_service.analyze(request, user)
         return res
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
         return {"error": str(e)}
+    except MystemPoolOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except AnalysisTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except AnalysisCancelled as e:
+        raise HTTPException(status_code=499, detail=str(e))
+
 
+@RequestsRouter.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+)
+async def analyze_batch(
+        request: Request,
+        files: List[UploadFile] = File(None),
+        directory: Optional[str] = Form(None),
+        section_id: int = Form(1),
+        user: User = Depends(current_active_user),
+        batch_service: BatchAnalysisService = Depends(),
+):
+    """
+    Пакетное тегирование загруженных файлов или каталога на сервере (только для администраторов).
+    Результаты возвращаются в формате NDJSON по мере готовности.
+    """
+    if directory is not None and not user.is_superuser:
+        raise HTTPException(status_code=403, detail="Импорт из каталога доступен только администраторам")
+    try:
+        if directory is not None:
+            items = await batch_service.collect_directory(directory)
+        else:
+            items = await batch_service.collect_uploads(files or [])
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        async for result in batch_service.analyze_batch(items, user.id, section_id, request):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@RequestsRouter.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=AnalysisJobSchema,
+    openapi_extra=upload_form_schema(priority={"type": "string", "default": "normal"}),
+)
+async def enqueue_analysis(
+        request: Request,
+        user: User = Depends(current_active_user),
+        job_service: AnalysisJobService = Depends(),
+):
+    """
+    Ставит книгу в очередь на анализ и сразу возвращает задачу.
+    """
+    try:
+        return await job_service.enqueue(request, user)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@RequestsRouter.get(
+    "/jobs",
+    status_code=status.HTTP_200_OK,
+    response_model=list[AnalysisJobSchema],
+)
+async def get_user_jobs(
+        user: User = Depends(current_active_user),
+        job_service: AnalysisJobService = Depends(),
+):
+    return await job_service.get_user_jobs(user)
+
+
+@RequestsRouter.get(
+    "/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=AnalysisJobSchema,
+)
+async def get_job(
+        job_id: int,
+        user: User = Depends(current_active_user),
+        job_service: AnalysisJobService = Depends(),
+):
+    """
+    Статус, прогресс и теги книги для задачи анализа.
+    """
+    return await job_service.get_job(job_id, user)
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional, List
+
+from pydantic import BaseModel
+
+
+class AnalysisJobBookSchema(BaseModel):
+    id: int
+    tags: Optional[List[str]] = None
+
+    class Config:
+        orm_mode = True
+
+
+class AnalysisJobSchema(BaseModel):
+    id: int
+    bookTitle: str
+    status: str
+    stage: Optional[str] = None
+    progress: float
+    priority: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    book: Optional[AnalysisJobBookSchema] = None
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+
+from fastapi import Depends, HTTPException, Request
+
+from configs.Database import AnalysisJob, User, async_session_maker
+from configs.settings import get_settings
+from modules.book_upload.main import SpooledBook, stream_upload
+from repositories.AnalysisCacheRepository import AnalysisCacheRepository
+from repositories.AnalysisJobRepository import AnalysisJobRepository
+from repositories.RequestRepository import RequestRepository
+from services.BookService import BookService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Приоритетные полосы очереди: чем больше число, тем раньше задача берётся в работу
+PRIORITY_LANES = {
+    "low": 0,
+    "normal": 1,
+    "high": 2,
+}
+
+
+class AnalysisJobDispatcher:
+    """
+    Фоновые воркеры, выполняющие задачи анализа из таблицы analysis_jobs.
+
+    Задачи хранятся в базе, поэтому переживают перезапуск приложения: задачи,
+    прерванные на середине, перестают обновлять heartbeat_at и выдаются повторно.
+    Пока задача выполняется, heartbeat_at обновляется каждые heartbeat_interval секунд.
+    """
+
+    def __init__(self, workers: int, max_per_user: int, max_attempts: int,
+                 poll_interval: float, stale_after: float, heartbeat_interval: float):
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """
+        Будит воркеры после постановки новой задачи.
+        """
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    job = await AnalysisJobRepository(session).claim_next(self.max_per_user, self.stale_after)
+            except Exception:
+                # База недоступна — пробуем снова через интервал опроса
+                logger.exception("Не удалось получить задачу анализа из очереди")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heartbeat = asyncio.create_task(self._heartbeat(job.id))
+            try:
+                await self._run(job.id)
+            except Exception:
+                # Ошибка базы при чтении или сохранении задачи не должна останавливать воркер;
+                # задача, оставшаяся в статусе running, будет выдана повторно как брошенная
+                logger.exception("Задача анализа %s прервана ошибкой", job.id)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        """
+        Периодически отмечает задачу живой в отдельной сессии, независимо от этапов анализа.
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with async_session_maker() as session:
+                    await AnalysisJobRepository(session).touch(job_id)
+            except Exception:
+                logger.exception("Не удалось обновить heartbeat задачи анализа %s", job_id)
+
+    async def _run(self, job_id: int) -> None:
+        async with async_session_maker() as session:
+            repository = AnalysisJobRepository(session)
+            job = await repository.get_by_id(job_id)
+            if job is None:
+                return
+            service = BookService(RequestRepository(session), AnalysisCacheRepository(session))
+            # После rollback атрибуты задачи истекают, поэтому читаем их заранее
+            file_path, attempts = job.file_path, job.attempts
+
+            async def progress(stage: str, value: float) -> None:
+                await repository.update_progress(job, stage, value)
+
+            try:
+                upload = SpooledBook(file_path, job.content_sha256, os.path.getsize(file_path))
+                result = await service.analyze_document(
+                    upload, job.bookTitle, job.user_id, job.section_id, progress=progress
+                )
+            except Exception as e:
+                await session.rollback()
+                retry = attempts < self.max_attempts and not isinstance(e, ValueError)
+                await repository.fail(job, str(e), retry)
+                if not retry:
+                    self._remove_upload(file_path)
+                return
+
+            await repository.finish(job, result["id"])
+            self._remove_upload(file_path)
+
+    @staticmethod
+    def _remove_upload(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class AnalysisJobService:
+    """
+    Сервис постановки задач анализа в очередь и получения их статуса.
+    """
+    def __init__(self, repository: AnalysisJobRepository = Depends()):
+        self.repository = repository
+
+    async def enqueue(self, request: Request, user: User, section_id: int = 1) -> AnalysisJob:
+        """
+        Сохраняет файл из multipart-формы и ставит задачу анализа в очередь.
+        Полоса приоритета берётся из поля формы priority.
+        """
+        upload = await stream_upload(request)
+        priority = upload.fields.get("priority", "normal")
+        if priority not in PRIORITY_LANES:
+            upload.book.remove()
+            raise HTTPException(status_code=400, detail=f"Unknown priority lane: {priority}")
+
+        job = AnalysisJob(
+            user_id=user.id,
+            section_id=section_id,
+            bookTitle=upload.filename,
+            file_path=upload.book.path,
+            content_sha256=upload.book.sha256,
+            priority=PRIORITY_LANES[priority],
+        )
+        try:
+            job = await self.repository.create(job)
+        except BaseException:
+            upload.book.remove()
+            raise
+        analysis_job_dispatcher.notify()
+        return job
+
+    async def get_job(self, job_id: int, user: User) -> AnalysisJob:
+        """
+        Возвращает задачу пользователя по ID.
+        """
+        job = await self.repository.get_by_id(job_id)
+        if not job or job.user_id != user.id:
+            raise HTTPException(status_code=404, detail="Analysis job not found")
+        return job
+
+    async def get_user_jobs(self, user: User) -> list[AnalysisJob]:
+        return await self.repository.get_all_user_jobs(user.id)
+
+
+analysis_job_dispatcher = AnalysisJobDispatcher(
+    workers=settings.analysis_job_workers,
+    max_per_user=settings.analysis_job_max_per_user,
+    max_attempts=settings.analysis_job_max_attempts,
+    poll_interval=settings.analysis_job_poll_interval,
+    stale_after=settings.analysis_job_stale_after,
+    heartbeat_interval=settings.analysis_job_heartbeat_interval,
+)
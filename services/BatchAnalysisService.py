@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+
+from fastapi import Depends, UploadFile
+from starlette.requests import Request
+
+from configs.Database import Book, async_session_maker
+from configs.settings import get_settings
+from modules.book_upload.main import SpooledBook, hash_file, spool_upload
+from modules.recommendation_cache.main import recommendation_cache
+from repositories.AnalysisCacheRepository import AnalysisCacheRepository
+from repositories.RequestRepository import RequestRepository
+from services.BookService import BookService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """
+    Книга в пакете: owned — файл создан нами и удаляется после анализа.
+    """
+    title: str
+    upload: SpooledBook
+    owned: bool
+
+
+def resolve_import_directory(directory: str) -> Path:
+    """
+    Каталог для импорта с сервера; допускаются только каталоги внутри batch_import_root.
+    """
+    if not settings.batch_import_root:
+        raise ValueError("Импорт из каталога на сервере отключён")
+    root = Path(settings.batch_import_root).resolve()
+    path = (root / directory).resolve()
+    if not path.is_relative_to(root) or not path.is_dir():
+        raise ValueError(f"Каталог {directory} не найден")
+    return path
+
+
+class BatchAnalysisService:
+    """
+    Пакетное тегирование книг.
+
+    Книги анализируются параллельно, но не больше concurrency одновременно.
+    Результаты выдаются по мере готовности; теги сохраняются пачками
+    по insert_size книг (или раз в flush_interval секунд) одной транзакцией.
+    """
+    book_service: BookService
+    request_repository: RequestRepository
+
+    def __init__(self, book_service: BookService = Depends(), request_repository: RequestRepository = Depends()):
+        self.book_service = book_service
+        self.request_repository = request_repository
+        self.concurrency = settings.batch_analysis_concurrency
+        self.insert_size = settings.batch_insert_size
+        self.flush_interval = settings.batch_flush_interval
+
+    async def collect_uploads(self, files: list[UploadFile]) -> list[BatchItem]:
+        if len(files) > settings.batch_max_files:
+            raise ValueError(f"В пакете больше {settings.batch_max_files} файлов")
+        items = []
+        try:
+            for file in files:
+                items.append(BatchItem(file.filename, await spool_upload(file), owned=True))
+        except BaseException:
+            self.release(items)
+            raise
+        return items
+
+    async def collect_paths(self, paths: Iterable[str]) -> list[BatchItem]:
+        return [BatchItem(Path(path).name, await hash_file(str(path)), owned=False) for path in paths]
+
+    async def collect_directory(self, directory: str) -> list[BatchItem]:
+        path = resolve_import_directory(directory)
+        return await self.collect_paths(sorted(str(p) for p in path.rglob("*.pdf")))
+
+    @staticmethod
+    def release(items: list[BatchItem]) -> None:
+        for item in items:
+            if item.owned:
+                item.upload.remove()
+
+    async def analyze_batch(self, items: list[BatchItem], user_id, section_id: int = 1,
+                            request: Optional[Request] = None) -> AsyncIterator[dict]:
+        """
+        Анализирует книги и выдаёт по одному результату на книгу в порядке готовности:
+        {"title", "id", "tags", "intro_strategy"} или {"title", "error"}.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Репозитории делят одну сессию, а её нельзя использовать из нескольких задач сразу
+        db_lock = asyncio.Lock()
+        pending = {asyncio.create_task(self._analyze_item(item, semaphore, db_lock, request)) for item in items}
+        buffer: list[tuple[Book, str]] = []
+        buffer_started = 0.0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self.flush_interval,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item, tags, intro_strategy, error = task.result()
+                    if error is not None:
+                        yield {"title": item.title, "error": error}
+                        continue
+                    if not buffer:
+                        buffer_started = time.monotonic()
+                    book = Book(bookTitle=item.title, user_id=user_id, section_id=section_id, tags=tags)
+                    buffer.append((book, intro_strategy))
+                if buffer and (len(buffer) >= self.insert_size or not pending
+                               or time.monotonic() - buffer_started >= self.flush_interval):
+                    try:
+                        async with db_lock:
+                            await self.request_repository.create_many([book for book, _ in buffer])
+                    except Exception as e:
+                        # Пачка не сохранилась: сообщаем об ошибке по каждой книге и продолжаем
+                        logger.exception("Не удалось сохранить пачку из %s книг", len(buffer))
+                        for book, _ in buffer:
+                            yield {"title": book.bookTitle, "error": str(e)}
+                        buffer = []
+                        continue
+                    await recommendation_cache.invalidate(chain.from_iterable(book.tags for book, _ in buffer))
+                    for book, intro_strategy in buffer:
+                        yield {"title": book.bookTitle, "id": book.id, "tags": book.tags,
+                               "intro_strategy": intro_strategy}
+                    buffer = []
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.release(items)
+
+    async def _analyze_item(self, item: BatchItem, semaphore: asyncio.Semaphore, db_lock: asyncio.Lock,
+                            request: Optional[Request]):
+        async with semaphore:
+            try:
+                async with db_lock:
+                    tags = await self.book_service.get_cached_tags(item.upload.sha256)
+                intro_strategy = "cache"
+                if tags is None:
+                    tags, intro_strategy = await self.book_service.extract_tags(item.upload, request)
+                    async with db_lock:
+                        await self.book_service.put_cached_tags(item.upload.sha256, tags)
+                return item, tags, intro_strategy, None
+            except Exception as e:
+                return item, None, None, str(e)
+
+
+async def tag_books(paths: Iterable[str], user_id, section_id: int = 1) -> AsyncIterator[dict]:
+    """
+    Пакетное тегирование книг с диска вне HTTP-запроса, например из скрипта дозаполнения тегов.
+    """
+    async with async_session_maker() as session:
+        request_repository = RequestRepository(session)
+        service = BatchAnalysisService(
+            BookService(request_repository, AnalysisCacheRepository(session)),
+            request_repository,
+        )
+        items = await service.collect_paths(paths)
+        async for result in service.analyze_batch(items, user_id, section_id):
+            yield result
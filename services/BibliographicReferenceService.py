@@ -1,6 +1,22 @@
+import datetime
+from typing import AsyncIterator, Optional
+
 from fastapi import Depends, HTTPException
+
+from configs.settings import get_settings
+from modules.pagination.main import Page, PageRequest
+from modules.recommendation_cache.main import recommendation_cache
 from repositories.BibliographicReferenceRepository import BibliographicReferenceRepository
 from repositories.RequestRepository import RequestRepository
+from schemas.BibliographicReferenceSchema import BibliographicReferenceSchema
+
+settings = get_settings()
+
+# Столбцы выгрузки каталога в порядке следования в CSV
+EXPORT_FIELDS = (
+    "id", "title", "author", "publisher", "isbn", "year", "city", "pages", "average_rating", "rating_count",
+    "gost_citation", "book_id", "book_title", "tags", "section_id", "updated_at",
+)
 
 
 class BibliographicReferenceService:
@@ -19,15 +35,18 @@ class BibliographicReferenceService:
         if existing_reference:
             raise HTTPException(status_code=400, detail="Bibliographic reference already exists for this book")
 
-        # Создаем новую справку
-        return await self.repository.create_bibliographic_reference(book_id, title, author, publisher,isbn,year, city, pages)
+        # Создаем новую справку; с ней книга становится кандидатом в рекомендации
+        reference = await self.repository.create_bibliographic_reference(book_id, title, author, publisher,isbn,year, city, pages)
+        book = await self.repository.get_book_by_bibliographic_reference_id(reference.id)
+        if book is not None:
+            await recommendation_cache.invalidate(book.tags)
+        return reference
 
-    async def get_all_references(self):
+    async def get_all_references(self, page: PageRequest) -> Page:
         """
-        Возвращает все библиографические справки.
+        Возвращает страницу библиографических справок.
         """
-        references = await self.repository.get_all()
-        return references
+        return await self.repository.get_all(page)
 
 
     async def get_reference_by_id(self, bibliographic_reference_id: int):
@@ -61,7 +80,10 @@ class BibliographicReferenceService:
         reference = await self.repository.get_by_id(bibliographic_reference_id)
         if not reference:
             raise HTTPException(status_code=404, detail="Bibliographic reference not found")
+        book = await self.repository.get_book_by_bibliographic_reference_id(bibliographic_reference_id)
         await self.repository.delete_by_id(bibliographic_reference_id)
+        if book is not None:
+            await recommendation_cache.invalidate(book.tags)
 
     async def get_all_references_with_books(self):
         """
@@ -69,11 +91,38 @@ class BibliographicReferenceService:
         """
         return await self.repository.get_all_with_books()
 
-    async def get_all_references_with_tags(self):
+    async def get_all_references_with_tags(self, page: PageRequest) -> Page:
         """
-        Возвращает список всех библиографических справок с тегами.
+        Возвращает страницу библиографических справок с тегами.
         """
-        return await self.repository.get_all_with_tags()
+        return await self.repository.get_all_with_tags(page)
+
+    async def get_all_references_with_sections(self, page: PageRequest) -> Page:
+        """
+        Возвращает страницу библиографических справок с разделами книг.
+        """
+        return await self.repository.get_all_with_sections(page)
+
+    async def get_references_by_section(self, section_id: int, page: PageRequest) -> Page:
+        return await self.repository.get_all_with_tags_by_section(section_id, page)
 
-    async def get_references_by_section(self, section_id: int):
-        return await self.repository.get_all_with_tags_by_section(section_id)
\ No newline at end of file
+    async def export_catalog(self, section_id: Optional[int] = None,
+                             updated_since: Optional[datetime.datetime] = None) -> AsyncIterator[dict]:
+        """
+        Плоские записи каталога по одной, с цитатой по ГОСТ; весь каталог в память не загружается.
+        """
+        # Время в базе хранится в UTC без часового пояса
+        if updated_since is not None and updated_since.tzinfo is not None:
+            updated_since = updated_since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        async for reference in self.repository.stream_catalog(section_id, updated_since,
+                                                              settings.catalog_export_batch_size):
+            data = BibliographicReferenceSchema.model_validate(reference, from_attributes=True).model_dump(mode="json")
+            book = data.pop("book") or {}
+            yield {
+                **{name: data[name] for name in EXPORT_FIELDS if name in data},
+                "book_id": book.get("id"),
+                "book_title": book.get("bookTitle"),
+                "tags": book.get("tags") or [],
+                "section_id": reference.book.section_id,
+                "updated_at": reference.updated_at.isoformat() if reference.updated_at else None,
+            }
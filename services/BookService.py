@@ -1,25 +1,47 @@
 import string
-import re
-
-import PyPDF2
-from pymystem3 import Mystem
+from typing import Optional, Callable, Awaitable
 
 from fastapi import Depends, UploadFile
+from starlette.requests import Request
 
 from configs.Database import Book, User
-from modules.get_book_intro.main import get_book_intro
+from configs.settings import get_settings
+from modules.analysis_executor.main import analysis_executor
+from modules.book_upload.main import SpooledBook, spool_upload, stream_upload
+from modules.cache.main import LRUCache
+from modules.get_book_intro.main import get_book_intro_text
+from modules.mystem_pool.main import mystem_pool
+from modules.pagination.main import Page, PageRequest
+from modules.recommendation_cache.main import recommendation_cache
+from modules.stopwords.main import stopword_registry
 from modules.tags_extract.main import get_keywords
+from modules.text_normalizer.main import WORD_PATTERN
+from repositories.AnalysisCacheRepository import AnalysisCacheRepository
 from repositories.RequestRepository import RequestRepository
 from schemas.RequestSchema import RequestCreate
-from itertools import chain
 from nltk import FreqDist
 
+ProgressCallback = Callable[[str, float], Awaitable[None]]
+
+# Версия алгоритма частотного анализа; увеличивать при любом изменении результата
+ANALYZER_VERSION = "mystem-freq-2"
+PUNCTUATION = string.punctuation + '-""...'
+
+settings = get_settings()
+tags_cache = LRUCache(maxsize=settings.analysis_cache_lru_size)
+
+
+def get_stopwords_version() -> str:
+    return stopword_registry.version("common")
+
 
 class BookService:
     request_repository: RequestRepository
-    def __init__(self, request_repository: RequestRepository = Depends()):
-        self.analizator = Mystem()
+    cache_repository: AnalysisCacheRepository
+    def __init__(self, request_repository: RequestRepository = Depends(),
+                 cache_repository: AnalysisCacheRepository = Depends()):
         self.request_repository = request_repository
+        self.cache_repository = cache_repository
 
     # async def create(self, file: UploadFile, user: User) -> RequestCreate:
     #     result_req = RequestCreate()
@@ -40,23 +62,78 @@ class BookService:
     #     created_result = await self.result_repository.create(result)
     #     return created_result
 
-    async def get_all_user_books(self, user_id):
-        return await self.request_repository.get_all_user_books(user_id)
+    async def get_all_user_books(self, user_id, page: PageRequest) -> Page:
+        return await self.request_repository.get_all_user_books(user_id, page)
 
-    async def analyze(self, file: UploadFile, user: User):
+    async def analyze(self, request: Request, user: User):
+        """
+        Анализ книги, загруженной multipart-формой в поле file.
+        """
+        upload = await stream_upload(request)
+        try:
+            return await self.analyze_document(upload.book, upload.filename, user.id, request=request)
+        finally:
+            upload.book.remove()
+
+    async def analyze_document(self, upload: SpooledBook, title: str, user_id, section_id: int = 1,
+                               request: Optional[Request] = None,
+                               progress: Optional[ProgressCallback] = None):
+        """
+        Анализ книги: извлечение введения, частотный анализ и сохранение тегов.
+        Повторно загруженная книга берёт теги из кэша по хэшу содержимого.
 
+        :param progress: Колбэк (этап, доля выполнения) для отчёта о ходе анализа.
+        """
         book = Book()
-        book.book = file.file.read()
-        book.bookTitle = file.filename
-        book.user_id = user.id
-        text = await self.get_book_intro_mystem(file)
-        tags = await self.freq_analyze(text)
+        book.bookTitle = title
+        book.user_id = user_id
+        tags = await self.get_cached_tags(upload.sha256)
+        intro_strategy = "cache"
+        if tags is None:
+            tags, intro_strategy = await self.extract_tags(upload, request, progress)
+            await self.put_cached_tags(upload.sha256, tags)
         book.tags = tags
-        book.section_id = 1
+        book.section_id = section_id
+        if progress:
+            await progress("save", 0.9)
         created_book = await self.request_repository.create(book)
+        await recommendation_cache.invalidate(book.tags)
         return {
             "id" : book.id ,
-            "tags" : book.tags}
+            "tags" : book.tags,
+            "intro_strategy": intro_strategy}
+
+    async def extract_tags(self, upload: SpooledBook, request: Optional[Request] = None,
+                           progress: Optional[ProgressCallback] = None) -> tuple[list[str], str]:
+        """
+        Теги книги без обращения к базе: введение и его частотный анализ.
+        Возвращает теги и способ, которым было найдено введение.
+        """
+        if progress:
+            await progress("intro", 0.1)
+        text, intro_strategy = await analysis_executor.run(get_book_intro_text, upload.path, request=request)
+        if text is None:
+            raise ValueError("В книге нет введения или предисловия.")
+        if progress:
+            await progress("freq_analyze", 0.5)
+        return await self.freq_analyze(text), intro_strategy
+
+    async def get_cached_tags(self, content_sha256: str) -> Optional[list[str]]:
+        """
+        Теги из кэша: сначала из памяти процесса, затем из базы.
+        """
+        key = (content_sha256, ANALYZER_VERSION, get_stopwords_version())
+        tags = tags_cache.get(key)
+        if tags is None:
+            tags = await self.cache_repository.get_tags(*key)
+            if tags is not None:
+                tags_cache.set(key, tuple(tags))
+        return list(tags) if tags is not None else None
+
+    async def put_cached_tags(self, content_sha256: str, tags: list[str]) -> None:
+        key = (content_sha256, ANALYZER_VERSION, get_stopwords_version())
+        await self.cache_repository.put_tags(*key, tags)
+        tags_cache.set(key, tuple(tags))
 
     async def freq_analyze(self, text: str):
         """
@@ -65,8 +142,9 @@ class BookService:
         stop_words = await self.get_stop()
         words = await self.get_words(text)
         text_test = ' '.join(words)
-        lemm_text = [word for word in self.analizator.lemmatize(text_test.lower())
-                     if word not in stop_words and word not in string.punctuation + '-""...']
+        lemmas = await mystem_pool.lemmatize(text_test.lower())
+        lemm_text = [word for word in lemmas
+                     if word not in stop_words and word not in PUNCTUATION]
         freq_words = [word_freq_pair[0] for word_freq_pair in FreqDist(lemm_text).most_common(11)]
         freq_words.pop(0)
         return freq_words
@@ -77,36 +155,21 @@ class BookService:
         Получить слова из текста
         """
         stop_words = await self.get_stop()
-        return [word for word in re.findall(r"\w+", text) if word not in stop_words]
+        return [word for word in WORD_PATTERN.findall(text) if word not in stop_words]
 
-    async def get_book_intro_mystem(self, book: UploadFile):
+    async def get_book_intro_mystem(self, book: UploadFile, request: Optional[Request] = None):
         """
         Извлечение введения из книги
         """
-        keywords = ['введение', 'предисловие']
-        pages = []
-        with book.file as file:
-            try:
-                pdf = PyPDF2.PdfReader(file)
-            except:
-                return None
-            num_pages = len(pdf.pages)
-            for page_num in range(num_pages):
-                if len(pages) == 2:
-                    break
-                page = pdf.pages[page_num]
-                text = page.extract_text()
-                for keyword in keywords:
-                    if keyword in text.lower():
-                        pages.append(text)
-        if not pages:
-            return None
-        pattern = re.compile(r'[А-ЯЁа-яё]+')
-        return ' '.join(re.findall(pattern, ' '.join(pages)))
-
-    async def get_stop(self):
+        upload = await spool_upload(book)
+        try:
+            text, _ = await analysis_executor.run(get_book_intro_text, upload.path, request=request)
+            return text
+        finally:
+            upload.remove()
+
+    async def get_stop(self) -> frozenset[str]:
         """
         Загрузка стоп-слов
         """
-        with open('stopwords.txt', 'r', encoding="utf-8") as stop_file:
-            return [word.strip() for word in stop_file.readlines()]
\ No newline at end of file
+        return stopword_registry.get("common")
\ No newline at end of file
@@ -1,8 +1,13 @@
 from fastapi import Depends, HTTPException
+from configs.settings import get_settings
+from modules.recommendation_cache.main import recommendation_cache
 from repositories.FeedbackRepository import FeedbackRepository
 from repositories.BibliographicReferenceRepository import BibliographicReferenceRepository
+from typing import Optional
 from uuid import UUID
 
+settings = get_settings()
+
 
 class FeedbackService:
     def __init__(
@@ -22,11 +27,14 @@ class FeedbackService:
         if not bibliographic:
             raise HTTPException(status_code=404, detail="Bibliographic reference not found")
 
-        # Добавляем отзыв
+        # Добавляем отзыв; рейтинг справки и глобальная статистика обновляются в той же транзакции
         feedback = await self.repository.add_feedback(user_id, bibliographic_reference_id, rating, comment)
+        bibliographic_rating = await self.repository.get_bibliographic_rating(bibliographic_reference_id)
 
-        # Пересчитываем средний рейтинг библиографической справки
-        bibliographic_rating = await self.repository.update_bibliographic_rating(bibliographic_reference_id)
+        # Рейтинг справки влияет только на рекомендации книг с общими тегами
+        book = await self.bibliographic_repository.get_book_by_bibliographic_reference_id(bibliographic_reference_id)
+        if book is not None:
+            await recommendation_cache.invalidate(book.tags)
 
         return {
             "message": "Feedback added successfully",
@@ -42,8 +50,13 @@ class FeedbackService:
         return await self.repository.get_by_bibliographic_reference_id(bibliographic_reference_id)
 
 
-    async def get_feedbacks_for_book(self, book_id: int):
-        feedbacks = await self.repository.get_feedbacks_by_book_id(book_id)
-        if not feedbacks:
+    async def get_feedbacks_for_book(self, book_id: int, limit: Optional[int] = None, offset: int = 0):
+        """
+        Страница отзывов на книгу. Размер страницы по умолчанию page_size_default,
+        не больше page_size_max; страница за последним отзывом пуста.
+        """
+        limit = min(limit or settings.page_size_default, settings.page_size_max)
+        feedbacks = await self.repository.get_feedbacks_by_book_id(book_id, limit, offset)
+        if not feedbacks and offset == 0:
             raise HTTPException(status_code=404, detail="Feedback not found")
         return feedbacks
@@ -1,7 +1,10 @@
 from fastapi import Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from math import sin, pi, exp
 import datetime
+
+from modules.recommendation_cache.main import recommendation_cache
+from modules.recommendation_scoring.main import build_columns, score_candidates, top_k_indices
 from repositories.FeedbackRepository import FeedbackRepository
 from repositories.BibliographicReferenceRepository import BibliographicReferenceRepository
 from repositories.RequestRepository import RequestRepository
@@ -18,6 +21,8 @@ class RecommendationService:
     4. Актуальность книги (снижение веса старых книг с использованием временного коэффициента).
 
     Итоговая оценка формируется на основе взвешенной суммы нормализованных факторов.
+    Оцениваются только книги, у которых есть хотя бы один общий тег с текущей.
+    Готовые результаты кэшируются по (id книги, top_n) в recommendation_cache.
     """
 
     # Весовые коэффициенты для факторов
@@ -48,8 +53,11 @@ class RecommendationService:
 
         :param bibliographic_reference_id: ID библиографической справки для текущей книги.
         :param top_n: Количество рекомендаций для возврата.
-        :return: Список рекомендованных книг с их итоговыми весами.
+        :return: Список рекомендованных книг с их итоговыми весами в JSON-совместимом виде.
         """
+        cached = await recommendation_cache.get(bibliographic_reference_id, top_n)
+        if cached is not None:
+            return cached
 
         #book = await self.bibliographic_repository.get_book_by_bibliographic_reference_id(bibliographic_reference_id)
 
@@ -58,56 +66,47 @@ class RecommendationService:
             raise HTTPException(status_code=404, detail="Book not found")
 
         current_tags = book.tags
+        if not current_tags:
+            return []
 
-        # Шаг 2: Получить глобальный средний рейтинг и параметр сглаживания k
+        # Шаг 2: Получить глобальный средний рейтинг и параметр сглаживания k из накопленной статистики
         global_avg_rating, k = await self.feedback_repository.calculate_global_average_and_k()
 
-        # Шаг 3: Получить все библиографические справки и связанные книги
-        all_references = await self.bibliographic_repository.get_all_with_books()
-
-        # Определение максимальных значений для нормализации
-        max_popularity = max(ref.rating_count for ref, _ in all_references)
-
+        # Шаг 3: Получить кандидатов — книги хотя бы с одним общим тегом (через GIN-индекс);
+        # текущая книга исключается запросом
+        candidates = await self.bibliographic_repository.get_candidates_with_books(
+            current_tags, exclude_id=bibliographic_reference_id
+        )
+
+        # Нормализация популярности — по всему каталогу, а не только по кандидатам
+        max_popularity = await self.bibliographic_repository.get_max_rating_count()
+
+        # Шаг 4: Рассчитать веса для кандидатов по колоночному снимку
+        columns = build_columns(
+            ((ref.rating_count, ref.average_rating, b.time, b.tags) for ref, b in candidates),
+            current_tags,
+            datetime.datetime.utcnow(),
+        )
+        scores = score_candidates(
+            columns,
+            tags_count=len(current_tags),
+            global_avg_rating=global_avg_rating,
+            k=k,
+            max_popularity=max_popularity,
+            tag_coefficient=self.TAG_WEIGHT_COEFFICIENT,
+            popularity_coefficient=self.POPULARITY_COEFFICIENT,
+            rating_coefficient=self.RATING_COEFFICIENT,
+            time_coefficient=self.TIME_WEIGHT_COEFFICIENT,
+            time_decay_alpha=self.TIME_DECAY_ALPHA,
+        )
+
+        # Шаг 5: Отбор лучших top_n без сортировки всех кандидатов
         recommendations = []
-
-        # Шаг 4: Рассчитать веса для всех книг
-        for ref, b in all_references:
-            if ref.id == bibliographic_reference_id:
-                continue  # Пропускаем текущую книгу
-
-            # Схожесть тегов с синусным весом
-            tag_weight = 0
-            max_possible_tag_weight = len(current_tags) * sin(pi / 2)
-            for tag in set(current_tags).intersection(set(b.tags)):
-                if tag in current_tags:
-                    index = current_tags.index(tag)
-                    tag_weight += sin((pi / 2) * (len(current_tags) - index) / len(current_tags))
-            normalized_tag_weight = (tag_weight / max_possible_tag_weight) * 5
-
-            # Популярность
-            popularity_weight = ref.rating_count
-            normalized_popularity_weight = (popularity_weight / max_popularity) * 5 if max_popularity > 0 else 0
-
-            # Взвешенный рейтинг
-            weighted_rating = (ref.rating_count / (ref.rating_count + k) * ref.average_rating) + (
-                k / (ref.rating_count + k) * global_avg_rating
-            )
-            normalized_weighted_rating = weighted_rating
-
-            # Актуальность
-            delta_days = (datetime.datetime.utcnow() - b.time).days
-            time_weight = exp(-self.TIME_DECAY_ALPHA * delta_days)
-            normalized_time_weight = time_weight * 5
-            # Итоговый вес
-            final_weight = (
-                normalized_tag_weight * self.TAG_WEIGHT_COEFFICIENT +
-                normalized_popularity_weight * self.POPULARITY_COEFFICIENT +
-                normalized_weighted_rating * self.RATING_COEFFICIENT +
-                normalized_time_weight * self.TIME_WEIGHT_COEFFICIENT
-            )
-
-            recommendations.append((ref, final_weight, f"{ref.author}. {ref.title}. – {ref.city}: {ref.publisher}, {ref.year}. – {ref.pages} с."))
-
-        # Шаг 5: Сортировка по итоговому весу и возврат результата
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-        return [r for r in recommendations[:top_n]]
+        for index in top_k_indices(scores, top_n):
+            ref, _ = candidates[index]
+            recommendations.append((ref, float(scores[index]), f"{ref.author}. {ref.title}. – {ref.city}: {ref.publisher}, {ref.year}. – {ref.pages} с."))
+
+        # В кэш кладётся уже сериализованный результат: так его одинаково хранят оба бэкенда
+        result = jsonable_encoder(recommendations)
+        await recommendation_cache.set(bibliographic_reference_id, top_n, current_tags, result)
+        return result
@@ -0,0 +1,43 @@
+"""
+Страницы отзывов на книгу: размер страницы ограничен, страница за концом списка пуста.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from services.FeedbackService import FeedbackService, settings
+
+
+class FakeFeedbackRepository:
+    def __init__(self, total: int):
+        self.feedbacks = list(range(total))
+        self.calls = []
+
+    async def get_feedbacks_by_book_id(self, book_id: int, limit: int, offset: int):
+        self.calls.append((limit, offset))
+        return self.feedbacks[offset:offset + limit]
+
+
+def get_page(total: int, limit=None, offset: int = 0):
+    repository = FakeFeedbackRepository(total)
+    service = FeedbackService(repository=repository, bibliographic_repository=None)
+    return asyncio.run(service.get_feedbacks_for_book(1, limit, offset)), repository.calls[0]
+
+
+def test_default_and_max_page_size():
+    _, (limit, _) = get_page(3)
+    assert limit == settings.page_size_default
+    _, (limit, _) = get_page(3, limit=settings.page_size_max + 1)
+    assert limit == settings.page_size_max
+
+
+def test_page_past_end_is_empty():
+    page, _ = get_page(3, limit=2, offset=4)
+    assert page == []
+
+
+def test_book_without_feedback_is_not_found():
+    with pytest.raises(HTTPException) as error:
+        get_page(0)
+    assert error.value.status_code == 404
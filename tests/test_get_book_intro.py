@@ -0,0 +1,59 @@
+"""
+Поиск введения по страницам: оглавление пропускается, колонтитулы и текст введения — нет.
+"""
+from modules.get_book_intro.main import _is_toc_page, locate_intro
+
+TOC_WITH_HEADING = "60\nОглавление\nСтр.\nВведение ........ 40\nГлава 1 ..... 50"
+TOC_WITH_LEADERS = ("Введение ................ 3\nТема 1 ................ 4\n"
+                    "Тема 2 ................ 15\nПриложение ............ 46")
+INTRO_WITH_HEADER = "Введение 5\nДанное учебное пособие предназначено для студентов"
+INTRO_WITH_YEAR = "ВВЕДЕНИЕ\nКурс читается с тех пор, как введение в 1998"
+
+
+class FakePage:
+    def __init__(self, text: str):
+        self.text = text
+
+    def extract_text(self) -> str:
+        return self.text
+
+
+class FakePdf:
+    """
+    Минимальная замена PdfReader: страницы без закладок.
+    """
+
+    def __init__(self, pages: list[str]):
+        self.pages = [FakePage(text) for text in pages]
+        self.outline = []
+
+
+def test_toc_pages_are_recognized():
+    assert _is_toc_page(TOC_WITH_HEADING)
+    assert _is_toc_page(TOC_WITH_LEADERS)
+
+
+def test_intro_pages_are_not_toc():
+    assert not _is_toc_page(INTRO_WITH_HEADER)
+    assert not _is_toc_page(INTRO_WITH_YEAR)
+
+
+def test_scan_skips_unresolved_toc():
+    # Номер 40 из оглавления не указывает на страницу введения, поэтому срабатывает перебор страниц
+    pdf = FakePdf(["Обложка", TOC_WITH_HEADING, "Текст", INTRO_WITH_HEADER])
+    location = locate_intro(pdf, "book.pdf", head_pages=10, tail_pages=0)
+    assert location.strategy == "scan"
+    assert location.pages[0] == INTRO_WITH_HEADER
+
+
+def test_scan_accepts_intro_with_running_header():
+    pdf = FakePdf(["Обложка", TOC_WITH_LEADERS, INTRO_WITH_HEADER, "Введение 6\nПродолжение"])
+    location = locate_intro(pdf, "book.pdf", head_pages=10, tail_pages=0)
+    assert location.pages[0] == INTRO_WITH_HEADER
+
+
+def test_scan_accepts_intro_with_number_in_text():
+    pdf = FakePdf(["Обложка", INTRO_WITH_YEAR])
+    location = locate_intro(pdf, "book.pdf", head_pages=10, tail_pages=0)
+    assert location.strategy == "scan"
+    assert location.pages[0] == INTRO_WITH_YEAR
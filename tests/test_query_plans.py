@@ -0,0 +1,90 @@
+"""
+Планы горячих запросов: каждый должен читать свою таблицу через ожидаемый индекс,
+а не последовательным сканированием.
+
+Нужна отдельная база Postgres, адрес которой задаётся в TEST_DATABASE_URL
+(postgresql+asyncpg://...); без него тесты пропускаются. Перед проверкой к базе
+применяются миграции. Таблицы в тестовой базе малы и планировщик и так выбрал бы
+Seq Scan, поэтому он отключается на время проверки (enable_seqscan = off):
+проверяется, что индекс существует и подходит запросу.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+from sqlalchemy import String, cast, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from configs.Database import BibliographicReference, Book, BookFeedback
+from migrations.main import migrate
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+
+USER_ID = "00000000-0000-0000-0000-000000000000"
+
+# (описание, запрос, индекс, который должен встретиться в плане)
+HOT_QUERIES = [
+    ("книги пользователя (/v1/documents)",
+     select(Book.id, Book.bookTitle).where(Book.user_id == USER_ID),
+     "ix_books_user_id"),
+    ("книги раздела (/v1/bibliographic/by-section)",
+     select(Book.id).where(Book.section_id == 1),
+     "ix_books_section_id"),
+    ("отзывы на справку",
+     select(BookFeedback).where(BookFeedback.bibliographic_reference_id == 1),
+     "ix_book_feedback_bibliographic_reference_id"),
+    ("отзывы пользователя",
+     select(BookFeedback.id).where(BookFeedback.user_id == USER_ID),
+     "ix_book_feedback_user_id"),
+    ("кандидаты в рекомендации с общими тегами",
+     select(BibliographicReference.id, Book.id)
+     .join(Book, BibliographicReference.book_id == Book.id)
+     .where(Book.tags.overlap(cast(postgresql.array(["программирование", "алгоритмы"]), postgresql.ARRAY(String)))),
+     "ix_books_tags_gin"),
+]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    found = set()
+    if "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", ()):
+        found |= used_indexes(child)
+    return found
+
+
+async def explain_hot_queries(url: str) -> dict[str, set[str]]:
+    """
+    Индексы из плана каждого горячего запроса по его описанию.
+    """
+    engine = create_async_engine(url)
+    try:
+        await migrate(engine)
+        indexes = {}
+        async with engine.connect() as conn:
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            for description, query, _ in HOT_QUERIES:
+                sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+                result = await conn.execute(text("EXPLAIN (FORMAT JSON) " + sql))
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                indexes[description] = used_indexes(plan[0]["Plan"])
+            await conn.rollback()
+        return indexes
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plan_indexes() -> dict[str, set[str]]:
+    return asyncio.run(explain_hot_queries(TEST_DATABASE_URL))
+
+
+@pytest.mark.parametrize("description, index", [(d, i) for d, _, i in HOT_QUERIES],
+                         ids=[i for _, _, i in HOT_QUERIES])
+def test_hot_query_uses_index(plan_indexes, description, index):
+    assert index in plan_indexes[description]
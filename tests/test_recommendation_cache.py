@@ -0,0 +1,41 @@
+"""
+Обратный индекс тег → книги в локальном кэше рекомендаций следует за записями LRU.
+"""
+import asyncio
+import time
+
+from modules.recommendation_cache.main import LocalBackend
+
+
+def indexed_books(backend: LocalBackend) -> dict[str, set[int]]:
+    return {tag: set(books) for tag, books in backend.books_by_tag.items()}
+
+
+def test_lru_eviction_removes_book_from_index():
+    backend = LocalBackend(maxsize=2, ttl=60)
+    for book_id in range(1, 4):
+        asyncio.run(backend.set(book_id, 5, {"общий", f"тег{book_id}"}, [book_id]))
+    assert indexed_books(backend) == {"общий": {2, 3}, "тег2": {2}, "тег3": {3}}
+
+
+def test_expired_entry_removes_book_from_index():
+    backend = LocalBackend(maxsize=10, ttl=0.01)
+    asyncio.run(backend.set(1, 5, {"алгоритмы"}, [1]))
+    time.sleep(0.02)
+    assert asyncio.run(backend.get(1, 5)) is None
+    assert indexed_books(backend) == {}
+
+
+def test_overwrite_with_other_tags_reindexes_book():
+    backend = LocalBackend(maxsize=10, ttl=60)
+    asyncio.run(backend.set(1, 5, {"алгоритмы", "графы"}, [1]))
+    asyncio.run(backend.set(1, 5, {"графы", "сети"}, [2]))
+    assert indexed_books(backend) == {"графы": {1}, "сети": {1}}
+
+
+def test_invalidate_tags_clears_other_tags_of_book():
+    backend = LocalBackend(maxsize=10, ttl=60)
+    asyncio.run(backend.set(1, 5, {"алгоритмы", "графы"}, [1]))
+    asyncio.run(backend.set(2, 5, {"сети"}, [2]))
+    assert asyncio.run(backend.invalidate_tags(["алгоритмы"])) == 1
+    assert indexed_books(backend) == {"сети": {2}}
@@ -0,0 +1,64 @@
+"""
+Побайтовая сверка общего нормализатора текста с эталонным корпусом.
+
+Эталон tests/golden/text_normalizer.jsonl записан прежними цепочками re.sub:
+образец введения и случайные тексты из символов, на которые реагируют правила.
+"""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from modules.text_normalizer.main import (
+    keywords_normalizer, letters_normalizer, rake_normalizer, russian_words, yake_normalizer,
+)
+
+GOLDEN_PATH = Path(__file__).parent / "golden" / "text_normalizer.jsonl"
+
+NORMALIZERS = {
+    "keywords": keywords_normalizer,
+    "yake": yake_normalizer,
+    "letters": letters_normalizer,
+    "rake": rake_normalizer,
+}
+
+
+def load_cases() -> list[dict]:
+    with GOLDEN_PATH.open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+CASES = load_cases()
+
+
+def random_chunks(rng: random.Random, text: str) -> list[str]:
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 8))))
+    bounds = [0] + cuts + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize("name", NORMALIZERS)
+def test_normalize_matches_golden(name):
+    normalizer = NORMALIZERS[name]
+    for case in CASES:
+        assert normalizer.normalize(case["text"]) == case[name], case["text"]
+
+
+@pytest.mark.parametrize("name", NORMALIZERS)
+def test_stream_matches_golden(name):
+    normalizer = NORMALIZERS[name]
+    rng = random.Random(name)
+    for case in CASES:
+        for _ in range(5):
+            chunks = random_chunks(rng, case["text"])
+            assert ''.join(normalizer.stream(chunks)) == case[name], chunks
+
+
+def test_russian_words_matches_golden():
+    rng = random.Random(15)
+    for case in CASES:
+        assert russian_words([case["text"]]) == case["russian_words"], case["text"]
+        # Части текста разделены пробелом, как при поиске по ' '.join(pages)
+        pages = random_chunks(rng, case["text"])
+        assert russian_words(pages) == russian_words([' '.join(pages)]), pages